@@ -0,0 +1,298 @@
+# analyze_logs.py
+# Streams debug/game.log files through mmap and summarises what happened in them
+import argparse
+import csv
+import math
+import mmap
+import os
+import re
+from collections import Counter
+
+LINE = re.compile(rb"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),(\d{3}) - (\w+) - (.*?)\r?\n?$")
+DEFAULT_LOGS = [os.path.join("debug", f"game.log.{i}") for i in (3, 2, 1)]  # Oldest first
+RATE_COLUMNS = ("frames", "projectile_updates", "shots", "segments_lost", "warnings", "errors")
+MATCH_DISTANCE = 40  # Furthest a logged projectile can be from where its track predicted it
+LAUNCH_DISTANCE = 80  # Same for a track's second point, before its velocity is known
+GRAVITY = 0.5  # Used to predict the next position; feathershot's lower gravity is within MATCH_DISTANCE
+RELEASE_BYTES = 32 * 1024 * 1024  # How much of a mapped log is read before its pages are released
+FRAME_GAP_MS = 8  # Older logs have no per-frame line; a gap this long between projectile lines starts a new frame
+
+
+class TrackBuilder:
+    # Rebuilds per-projectile trajectories from "Updating projectile: pos=[x, y]"
+    # lines, which carry no id. Positions logged in a frame are matched to the
+    # tracks alive last frame by predicted position; anything unmatched starts a
+    # new track, taking its ammo type from the latest launches. Only live
+    # tracks are held in memory; finished ones go straight to `write`.
+    def __init__(self, write=None):
+        self.write = write
+        self.active = []  # [id, ammo, points, vx, vy]
+        self.launches = []
+        self.points = []
+        self.next_id = 0
+        self.finished = 0
+        self.lengths = Counter()  # Frames in flight -> tracks
+        self.by_ammo = Counter()
+
+    def launch(self, frame, ammo):
+        self.launches.append((frame, ammo))
+
+    def point(self, x, y):
+        self.points.append((x, y))
+
+    def end_frame(self, source, frame):
+        pairs = []
+        for t, track in enumerate(self.active):
+            x, y = track[2][-1][1:]
+            px, py = x + track[3], y + track[4] + GRAVITY
+            limit = MATCH_DISTANCE if len(track[2]) > 1 else LAUNCH_DISTANCE
+            for p, (qx, qy) in enumerate(self.points):
+                distance = math.hypot(qx - px, qy - py)
+                if distance <= limit:
+                    pairs.append((distance, t, p))
+        pairs.sort()
+        track_for = {}
+        used = set()
+        for _, t, p in pairs:
+            if t not in track_for and p not in used:
+                track_for[t] = p
+                used.add(p)
+
+        survivors = []
+        for t, track in enumerate(self.active):
+            if t in track_for:
+                x, y = self.points[track_for[t]]
+                last = track[2][-1]
+                track[3], track[4] = x - last[1], y - last[2]
+                track[2].append((frame, x, y))
+                survivors.append(track)
+            else:
+                self._finish(source, track)
+        for p, (x, y) in enumerate(self.points):
+            if p not in used:
+                ammo = self.launches.pop(0)[1] if self.launches else "unknown"
+                survivors.append([self.next_id, ammo, [(frame, x, y)], 0.0, 0.0])
+                self.next_id += 1
+        self.active = survivors
+        # A launch is logged just before the frame its projectile first appears in
+        self.launches = [launch for launch in self.launches if launch[0] >= frame]
+        self.points.clear()
+
+    def close(self, source):
+        for track in self.active:
+            self._finish(source, track)
+        self.active = []
+        self.launches.clear()
+        self.points.clear()
+
+    def _finish(self, source, track):
+        self.finished += 1
+        self.lengths[len(track[2])] += 1
+        self.by_ammo[track[1]] += 1
+        if self.write:
+            for frame, x, y in track[2]:
+                self.write((source, track[0], track[1], frame, f"{x:.2f}", f"{y:.2f}"))
+
+
+class Analysis:
+    # Running totals for any number of log files, fed one line at a time
+    def __init__(self, trajectories=None, segments=None, rates=None):
+        self.tracks = TrackBuilder(trajectories)
+        self.write_segment = segments
+        self.write_rate = rates
+        self.lines = 0
+        self.unparsed = 0
+        self.levels = Counter()
+        self.shots = Counter()
+        self.power = Counter()  # Ammo -> summed power
+        self.no_ammo = Counter()
+        self.segment_losses = 0
+        self.shortest_snake = None
+        self.outcomes = Counter()
+        self.sessions = 0
+        self.frames = 0
+        self.lowest_health = None
+        self.projectile_updates = 0
+        self.first = self.last = None
+        self.second = None
+        self.rate = Counter()
+        self.peak = Counter()
+        self.seconds = 0
+        self.frame = 0
+        self.frame_start = None  # Time of the first projectile line in the current frame
+        self.health_frames = False  # Whether this file marks frames with "Player health" lines
+
+    def feed_file(self, path):
+        source = os.path.basename(path)
+        self.frame = 0
+        self.frame_start = None
+        self.health_frames = False
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            release = hasattr(mm, "madvise") and hasattr(mmap, "MADV_DONTNEED")
+            if release:
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            released = 0
+            for line in iter(mm.readline, b""):
+                self.feed(source, line)
+                if release and mm.tell() - released >= RELEASE_BYTES:
+                    # Drop pages already read so resident memory stays bounded
+                    done = mm.tell() // mmap.PAGESIZE * mmap.PAGESIZE
+                    mm.madvise(mmap.MADV_DONTNEED, released, done - released)
+                    released = done
+        self.tracks.end_frame(source, self.frame)
+        self.tracks.close(source)
+
+    def feed(self, source, line):
+        self.lines += 1
+        match = LINE.match(line)
+        if not match:
+            self.unparsed += 1
+            return
+        second, millis, level, message = match.groups()
+        self._tick(second)
+        self.levels[level] += 1
+        if level == b"WARNING":
+            self.rate["warnings"] += 1
+        elif level in (b"ERROR", b"CRITICAL"):
+            self.rate["errors"] += 1
+
+        if message.startswith(b"Player health: "):
+            # The player is updated first every running frame
+            self.health_frames = True
+            self.tracks.end_frame(source, self.frame)
+            self.frame += 1
+            self.frames += 1
+            self.rate["frames"] += 1
+            health = float(message[15:])
+            if self.lowest_health is None or health < self.lowest_health:
+                self.lowest_health = health
+        elif message.startswith(b"Updating projectile: pos=["):
+            if not self.health_frames:
+                now = int(second[11:13]) * 3600000 + int(second[14:16]) * 60000 + int(second[17:19]) * 1000 + int(millis)
+                if self.frame_start is None or now - self.frame_start >= FRAME_GAP_MS:
+                    self.tracks.end_frame(source, self.frame)
+                    self.frame += 1
+                    self.frame_start = now
+            x, y = message[26:message.index(b"]")].split(b",")
+            self.tracks.point(float(x), float(y))
+            self.projectile_updates += 1
+            self.rate["projectile_updates"] += 1
+        elif message.startswith(b"Updating ") and message.endswith(b" projectiles"):
+            # Batched format: one line per frame with a count and no positions
+            count = int(message[9:-12])
+            self.projectile_updates += count
+            self.rate["projectile_updates"] += count
+        elif message.startswith(b"Shooting "):
+            words = message.split()
+            ammo = words[1].decode()
+            self.shots[ammo] += 1
+            self.power[ammo] += float(words[-1])
+            self.rate["shots"] += 1
+        elif message.startswith(b"Projectile launched: "):
+            self.tracks.launch(self.frame, message[21:].decode())
+        elif message.startswith(b"Cannot shoot: No ammo for "):
+            self.no_ammo[message[26:].decode()] += 1
+        elif message.startswith(b"Removed segment, new length: "):
+            length = int(message[29:])
+            self.segment_losses += 1
+            self.rate["segments_lost"] += 1
+            if self.shortest_snake is None or length < self.shortest_snake:
+                self.shortest_snake = length
+            if self.write_segment:
+                self.write_segment((source, f"{second.decode()}.{millis.decode()}", self.frame, length))
+        elif message == b"Game starting":
+            self.sessions += 1
+        elif message.endswith(b"setting game_state to won"):
+            self.outcomes["won"] += 1
+        elif message.endswith(b"setting game_state to lost"):
+            self.outcomes["lost"] += 1
+        elif message == b"Game reset":
+            self.outcomes["reset"] += 1
+
+    def _tick(self, second):
+        # Per-second counters are flushed as soon as the clock moves on
+        if second == self.second:
+            return
+        if self.first is None:
+            self.first = second
+        self.last = second
+        self._flush_second()
+        self.second = second
+
+    def _flush_second(self):
+        if self.second is None:
+            return
+        self.seconds += 1
+        for column in RATE_COLUMNS:
+            self.peak[column] = max(self.peak[column], self.rate[column])
+        if self.write_rate:
+            self.write_rate((self.second.decode(), *(self.rate[column] for column in RATE_COLUMNS)))
+        self.rate.clear()
+
+    def finish(self):
+        self._flush_second()
+        self.second = None
+
+    def report(self):
+        lines = [f"{self.lines} lines ({self.unparsed} unparsed), {self.sessions} sessions, {self.frames} logged frames"]
+        if self.first:
+            lines.append(f"from {self.first.decode()} to {self.last.decode()} ({self.seconds} seconds with activity)")
+        lines.append("levels: " + ", ".join(f"{level.decode()} {count}" for level, count in sorted(self.levels.items())))
+        for ammo, count in sorted(self.shots.items()):
+            lines.append(f"shots {ammo:12s} {count:6d}  mean power {self.power[ammo] / count:6.1f}  out of ammo {self.no_ammo[ammo]}")
+        for ammo in sorted(set(self.no_ammo) - set(self.shots)):
+            lines.append(f"shots {ammo:12s} {0:6d}  out of ammo {self.no_ammo[ammo]}")
+        lines.append(f"segments lost: {self.segment_losses}, shortest snake: {self.shortest_snake}")
+        lines.append("outcomes: " + (", ".join(f"{k} {v}" for k, v in sorted(self.outcomes.items())) or "none"))
+        if self.lowest_health is not None:
+            lines.append(f"lowest player health: {self.lowest_health:g}")
+        lines.append(f"projectile updates: {self.projectile_updates}")
+        tracks = self.tracks
+        if tracks.finished:
+            mean = sum(length * count for length, count in tracks.lengths.items()) / tracks.finished
+            lines.append(f"trajectories: {tracks.finished} (mean {mean:.1f} frames in flight); " +
+                         ", ".join(f"{ammo} {count}" for ammo, count in sorted(tracks.by_ammo.items())))
+        if self.seconds:
+            lines.append("peak per second: " + ", ".join(f"{column} {self.peak[column]}" for column in RATE_COLUMNS))
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise SkySnake debug logs without loading them into memory")
+    parser.add_argument("logs", nargs="*", help="Log files, oldest first (default: debug/game.log.3 .2 .1)")
+    parser.add_argument("--csv", metavar="DIR", help="Write trajectories.csv, segments.csv and rates.csv to DIR")
+    args = parser.parse_args()
+
+    paths = args.logs or [path for path in DEFAULT_LOGS if os.path.exists(path)]
+    files = []
+    writers = {}
+    if args.csv:
+        os.makedirs(args.csv, exist_ok=True)
+        headers = {
+            "trajectories": ("file", "track", "ammo", "frame", "x", "y"),
+            "segments": ("file", "time", "frame", "length"),
+            "rates": ("second", *RATE_COLUMNS),
+        }
+        for name, header in headers.items():
+            f = open(os.path.join(args.csv, f"{name}.csv"), "w", newline="")
+            files.append(f)
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writers[name] = writer.writerow
+
+    try:
+        analysis = Analysis(writers.get("trajectories"), writers.get("segments"), writers.get("rates"))
+        for path in paths:
+            analysis.feed_file(path)
+        analysis.finish()
+    finally:
+        for f in files:
+            f.close()
+    print(analysis.report())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
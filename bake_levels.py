@@ -0,0 +1,29 @@
+# bake_levels.py
+# Bakes level .json files into the .baked.npz files the game loads
+import argparse
+import glob
+import json
+import os
+import time
+from classes.level import LEVEL_DIR, bake_file, baked_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge level platforms and build their collision tile grid ahead of time")
+    parser.add_argument("levels", nargs="*", help="Level .json files (default: every level in levels/)")
+    args = parser.parse_args()
+
+    paths = args.levels or sorted(glob.glob(os.path.join(LEVEL_DIR, "*.json")))
+    for path in paths:
+        with open(path) as f:
+            authored = len(json.load(f).get("platforms", []))
+        start = time.perf_counter()
+        arrays = bake_file(path)
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {authored} platforms -> {len(arrays['rects'])} rects, "
+              f"{len(arrays['starts']) - 1} tiles in {elapsed * 1000:.1f}ms -> {baked_path(path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+# balance.py
+# Plays many seeded headless games with BotPlayer across a process pool and
+# tabulates outcomes for every combination of the balance values given
+import argparse
+import copy
+import csv
+import itertools
+import logging
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import config
+from classes.world import World
+from classes.bot import BotPlayer
+
+# Tables in config/config.py that --set may change, as "table.key=v1,v2,..."
+TUNABLE = ("velocity_multipliers", "ammo_gravity", "ammo_max_bounces", "starting_ammo", "balance")
+DEFAULTS = {name: copy.deepcopy(getattr(config, name)) for name in TUNABLE}
+
+
+def parse_setting(text):
+    # "balance.fall_damage=30,45" -> ("balance", "fall_damage", [30, 45])
+    try:
+        name, values = text.split("=", 1)
+        table, key = name.split(".", 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected table.key=value[,value...], got {text!r}")
+    if table not in TUNABLE or key not in DEFAULTS[table]:
+        raise argparse.ArgumentTypeError(f"unknown balance value {name!r}")
+    kind = type(DEFAULTS[table][key])
+    if kind is bool:
+        kind = lambda value: value.lower() in ("1", "true", "yes", "on")
+    return table, key, [kind(value) for value in values.split(",")]
+
+
+def apply(overrides):
+    # Reset every tunable table to its defaults, then apply the overrides in place
+    # so modules that imported the tables see the new values
+    for name in TUNABLE:
+        table = getattr(config, name)
+        table.clear()
+        table.update(copy.deepcopy(DEFAULTS[name]))
+    for (table, key), value in overrides:
+        getattr(config, table)[key] = value
+
+
+def play(task):
+    # Runs in a worker process: one full game, returns its outcome
+    overrides, seed, max_frames, aim_error = task
+    apply(overrides)
+    random.seed(seed)
+    world = World()
+    bot = BotPlayer(world, seed, aim_error=aim_error)
+    frames = world.run(max_frames, bot)
+    state = world.game_state
+    return {
+        "outcome": state if state in ("won", "lost") else "timeout",
+        "frames": frames,
+        "shots": bot.shots,
+        "health": world.player.health,
+        "segments": len(world.snake.segments),
+    }
+
+
+def quiet_worker():
+    logging.disable(logging.CRITICAL)
+
+
+def summarize(results):
+    wins = [r["frames"] for r in results if r["outcome"] == "won"]
+    return {
+        "games": len(results),
+        "win_rate": len(wins) / len(results),
+        "deaths": sum(r["outcome"] == "lost" for r in results),
+        "timeouts": sum(r["outcome"] == "timeout" for r in results),
+        "mean_win_s": statistics.mean(wins) / config.TICK_RATE if wins else None,
+        "median_win_s": statistics.median(wins) / config.TICK_RATE if wins else None,
+        "mean_shots": statistics.mean(r["shots"] for r in results),
+        "mean_health": statistics.mean(r["health"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep SkySnake balance values over many bot-played headless games")
+    parser.add_argument("--set", dest="settings", metavar="TABLE.KEY=V1,V2", type=parse_setting, action="append",
+                        default=[], help=f"Values to try; tables: {', '.join(TUNABLE)}")
+    parser.add_argument("--games", type=int, default=32, help="Games (seeds) per combination")
+    parser.add_argument("--seed", type=int, default=0, help="First seed; every combination plays the same seeds")
+    parser.add_argument("--frames", type=int, default=5 * 60 * config.TICK_RATE,
+                        help="Ticks before a game counts as a timeout (default five minutes)")
+    parser.add_argument("--aim-error", type=float, default=6.0, help="Bot aim spread in degrees")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--csv", metavar="FILE", help="Also write the table as CSV")
+    args = parser.parse_args()
+
+    keys = [(table, key) for table, key, _ in args.settings]
+    combos = list(itertools.product(*(values for _, _, values in args.settings)))
+    seeds = range(args.seed, args.seed + args.games)
+    tasks = [(list(zip(keys, combo)), seed, args.frames, args.aim_error) for combo in combos for seed in seeds]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=quiet_worker) as pool:
+        chunk = max(1, len(tasks) // (args.workers * 4))
+        results = list(pool.map(play, tasks, chunksize=chunk))
+    elapsed = time.perf_counter() - start
+
+    names = [f"{table}.{key}" for table, key in keys]
+    columns = ("games", "win_rate", "deaths", "timeouts", "mean_win_s", "median_win_s", "mean_shots", "mean_health")
+    rows = []
+    for i, combo in enumerate(combos):
+        summary = summarize(results[i * args.games:(i + 1) * args.games])
+        rows.append([*combo, *(summary[column] for column in columns)])
+
+    def cell(value):
+        if value is None:
+            return "-"
+        return f"{value:.3g}" if isinstance(value, float) else str(value)
+
+    header = [*names, *columns]
+    widths = [max(len(name), 8) for name in header]
+    print("  ".join(name.rjust(width) for name, width in zip(header, widths)))
+    for row in rows:
+        print("  ".join(cell(value).rjust(width) for value, width in zip(row, widths)))
+    print(f"{len(tasks)} games in {elapsed:.1f}s on {args.workers} workers ({len(tasks) / elapsed:.1f} games/s)")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,268 @@
+# benchmark.py
+# Headless performance scenarios with frame-time percentiles and JSON output
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Draw without opening a real window
+
+import numpy as np
+import pygame
+from config.config import WIDTH, HEIGHT, LEVEL, WAVE_SNAKES, WAVE_SEGMENTS, ammo_colors
+from classes.world import World
+from classes.renderer import Renderer
+from classes.governor import FrameGovernor
+from classes.projectile import projectile_pool
+from classes.acid_droplet import droplet_pool
+from classes.food import food_pool
+from classes.level import level_path
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def launch(world, rng, ammo_type):
+    # A projectile from somewhere along the bottom, fired up into the play area
+    world.projectiles.add(projectile_pool.acquire(rng.uniform(0, WIDTH), HEIGHT - 60, rng.uniform(-8, 8), rng.uniform(-22, -8), ammo_type))
+
+
+def keep_in_flight(ammo_type, count):
+    # Replace landed projectiles so `count` are always moving
+    def setup(world, rng):
+        for _ in range(count):
+            launch(world, rng, ammo_type)
+
+    def tick(world, rng):
+        for proj in world.projectiles.sprites():
+            if proj.stopped and not proj.is_platform:
+                proj.kill()
+        for _ in range(count - len(world.projectiles)):
+            launch(world, rng, ammo_type)
+    return setup, tick
+
+
+def long_snake(world, rng):
+    while len(world.snake.segments) < 300:
+        world.snake.grow()
+
+
+def acid_rain(world, rng):
+    for _ in range(5):
+        world.acid_group.add(droplet_pool.acquire(rng.uniform(0, WIDTH), 0))
+
+
+def feast(world, rng):
+    # 300 food with the snake hunting it down
+    world.snake.seek_food = True
+    for _ in range(300):
+        world.food_group.add(food_pool.acquire())
+
+
+def platforms_setup(world, rng):
+    for _ in range(200):
+        proj = projectile_pool.acquire(rng.uniform(0, WIDTH), rng.uniform(300, HEIGHT - 100), 0, 0, "feathershot")
+        world.projectiles.add(proj)
+        proj.make_platform()
+
+
+def platforms_tick(world, rng):
+    moving = sum(1 for proj in world.projectiles if not proj.stopped)
+    for proj in world.projectiles.sprites():
+        if proj.stopped and not proj.is_platform:
+            proj.kill()
+    for _ in range(100 - moving):
+        launch(world, rng, "bouncy")
+
+
+def aiming(world, rng):
+    # Charging a bouncy shot (which sees feathershot platforms) with a new
+    # power every frame, so the preview is re-predicted
+    world.player.current_ammo = "bouncy"
+    world.charging = True
+    world.power = rng.uniform(30, 100)
+
+
+under_fire = keep_in_flight("regular", 100)[1]
+
+
+def wave_setup(world, rng):
+    world.wave = WAVE_SNAKES
+    world.reset()
+
+
+def wave_tick(world, rng):
+    # A full wave under fire from 100 shots, topped back up after every frame
+    if len(world.snakes) < WAVE_SNAKES:
+        world.reset()
+    for snake in world.snakes:
+        while len(snake.segments) < WAVE_SEGMENTS:
+            snake.grow()
+    under_fire(world, rng)
+
+
+# Name -> (setup(world, rng) run once, tick(world, rng) run before every frame, untimed)
+SCENARIOS = {f"projectiles_{ammo}": keep_in_flight(ammo, 500) for ammo in ammo_colors}
+SCENARIOS.update({
+    "long_snake": (long_snake, None),
+    "acid_rain": (None, acid_rain),
+    "feast": (feast, None),
+    "feathershot_platforms": (platforms_setup, platforms_tick),
+    "aiming": (platforms_setup, aiming),
+    "wave": (wave_setup, wave_tick),
+})
+
+
+def stats(samples):
+    ms = np.array(samples) * 1000
+    return {"mean": float(ms.mean()), "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)), "p99": float(np.percentile(ms, 99))}
+
+
+def run_scenario(name, frames, seed, renderer):
+    setup, tick = SCENARIOS[name]
+    random.seed(seed)
+    rng = random.Random(seed)
+    world = World()
+    if setup:
+        setup(world, rng)
+    update_times = []
+    draw_times = []
+    for _ in range(frames):
+        if tick:
+            tick(world, rng)
+        start = time.perf_counter()
+        world.step()
+        middle = time.perf_counter()
+        renderer.draw(world, (WIDTH // 2, HEIGHT // 2))
+        end = time.perf_counter()
+        update_times.append(middle - start)
+        draw_times.append(end - middle)
+        # Keep the scenario going whatever happens to the player or snake
+        if world.game_state != "running":
+            world.game_state = "running"
+            world.player.health = 100
+    totals = [u + d for u, d in zip(update_times, draw_times)]
+    return {"update": stats(update_times), "draw": stats(draw_times), "frame": stats(totals)}
+
+
+def launch_time(workdir, level, env):
+    # Seconds from starting main.py to it quitting after its first frame
+    start = time.perf_counter()
+    subprocess.run([sys.executable, MAIN, "--quit-after", "1", "--level", level], cwd=workdir, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def run_startup(launches, seed):
+    # Cold launches start with no compiled bytecode and an unbaked level, as
+    # on a first run; warm launches are the next one with both cached. Each
+    # pair runs in its own scratch directory, which also takes the logs.
+    cold = []
+    warm = []
+    for _ in range(launches):
+        with tempfile.TemporaryDirectory() as workdir:
+            level = shutil.copy(level_path(LEVEL), workdir)
+            env = dict(os.environ, PYTHONPYCACHEPREFIX=os.path.join(workdir, "pycache"))
+            env.pop("PYTHONDONTWRITEBYTECODE", None)  # Warm launches need the bytecode cold ones write
+            cold.append(launch_time(workdir, level, env))
+            warm.append(launch_time(workdir, level, env))
+    # Building a World and resetting one, in this process
+    random.seed(seed)
+    build_times = []
+    for _ in range(20):
+        start = time.perf_counter()
+        world = World()
+        build_times.append(time.perf_counter() - start)
+    reset_times = []
+    for _ in range(200):
+        start = time.perf_counter()
+        world.reset()
+        reset_times.append(time.perf_counter() - start)
+    return {"cold": stats(cold), "warm": stats(warm), "world": stats(build_times), "reset": stats(reset_times)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    # Print p95 frame-time (and startup) changes against a previous run; True if any regressed
+    regressed = False
+    pairs = []  # (name, p95 before, p95 after)
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous:
+            pairs.append((name, previous["frame"]["p95"], current["frame"]["p95"]))
+    if "startup" in results and "startup" in baseline:
+        for part, current in results["startup"].items():
+            pairs.append((f"startup {part}", baseline["startup"][part]["p95"], current["p95"]))
+    for name, before, after in pairs:
+        change = (after - before) / before if before else 0.0
+        flag = "REGRESSION" if change > threshold else ""
+        regressed = regressed or change > threshold
+        print(f"{name:28s} p95 {before:8.3f} -> {after:8.3f} ms ({change:+.1%}) {flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run SkySnake performance scenarios headless")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", type=int, default=600, help="Frames per scenario")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for scenario setup and the game RNG")
+    parser.add_argument("--dirty", action="store_true", help="Measure the dirty-rectangle renderer")
+    parser.add_argument("--detail", type=int, default=0, help="Draw at this frame governor detail level (0 is full detail)")
+    parser.add_argument("--json", metavar="FILE", help="Write results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Compare against a previous --json run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p95 slowdown that counts as a regression")
+    parser.add_argument("--startup", type=int, metavar="N",
+                        help="Also time N cold and N warm launches of main.py to its first frame, and World resets "
+                             "(only these unless scenarios are named)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    governor = FrameGovernor(enabled=False)  # Held at --detail rather than adapting
+    governor.set_level(args.detail)
+    font = pygame.font.Font(None, 36)
+
+    names = args.scenarios or ([] if args.startup else list(SCENARIOS))
+    results = {"commit": git_commit(), "frames": args.frames, "seed": args.seed, "dirty": args.dirty, "detail": args.detail,
+               "scenarios": {}}
+    print(f"{'scenario':28s} {'part':6s} {'mean':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s}  (ms)")
+    for name in names:
+        # A fresh renderer per scenario, so no dirty rects or cached HUD carry over from the last one
+        renderer = Renderer(screen, font, dirty=args.dirty, governor=governor)
+        result = run_scenario(name, args.frames, args.seed, renderer)
+        results["scenarios"][name] = result
+        for part in ("update", "draw", "frame"):
+            s = result[part]
+            print(f"{name:28s} {part:6s} {s['mean']:8.3f} {s['p50']:8.3f} {s['p95']:8.3f} {s['p99']:8.3f}")
+    if args.startup:
+        results["startup"] = run_startup(args.startup, args.seed)
+        for part, s in results["startup"].items():
+            print(f"{'startup':28s} {part:6s} {s['mean']:8.3f} {s['p50']:8.3f} {s['p95']:8.3f} {s['p99']:8.3f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,30 +1,80 @@
 # classes/acid_droplet.py
-import pygame
-from config.config import NEON_GREEN, HEIGHT
+import numpy as np
+from config.config import NEON_GREEN, HEIGHT, TICK
+from classes.batch import BatchField, BatchGroup, rect_array, sweep
+from classes.surface_cache import solid_surface
+from classes.pool import Pool, PooledSprite
+
+class AcidDroplet(PooledSprite):
+    # Hot state is stored in the AcidGroup's arrays while the droplet is in one
+    x = BatchField()
+    y = BatchField()
+    vy = BatchField()
+    gravity = BatchField()
+    batch = None
+    slot = None
 
-class AcidDroplet(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
-        self.image = pygame.Surface((10, 10))
-        self.image.fill(NEON_GREEN)
-        self.rect = self.image.get_rect(center=(x, y))
-        self.pos = [x, y]
+        self.image = solid_surface((10, 10), NEON_GREEN)
+        self.rect = self.image.get_rect()
+        self.reuse(x, y)
+
+    def reuse(self, x, y):
+        # (Re)initialise; called by droplet_pool.acquire() on a released droplet
+        self.rect.center = (x, y)
+        self.x = x
+        self.y = y
         self.vy = 5
         self.gravity = 0.5
 
-    def update(self, platforms, snake_segments, feathershot_platforms):
-        self.pos[1] += self.vy
-        self.vy += self.gravity
-        self.rect.center = (int(self.pos[0]), int(self.pos[1]))
+    @property
+    def pos(self):
+        return [self.x, self.y]
+
+
+droplet_pool = Pool(AcidDroplet)
+
+
+class AcidGroup(BatchGroup):
+    # Moves and collides every droplet in a few array operations per frame
+    fields = {"x": np.float64, "y": np.float64, "vy": np.float64, "gravity": np.float64}
+
+    def update(self, platforms, feathershot_platforms, grid=None):
+        n = self.compact()
+        if not n:
+            return
+        # Collisions are swept over the frame's fall so fast drops can't skip a platform
+        rows = np.arange(n)
+        left0 = self.left[:n].copy()
+        top0 = self.top[:n].copy()
+        self.y[:n] += self.vy[:n] * TICK
+        self.vy[:n] += self.gravity[:n] * TICK
+        self.left[:n] = np.trunc(self.x[:n]).astype(np.int64) - self.width[:n] // 2
+        self.top[:n] = np.trunc(self.y[:n]).astype(np.int64) - self.height[:n] // 2
+        left = self.left[:n]
+        top = self.top[:n]
+        width = self.width[:n]
+        height = self.height[:n]
+        members = self.members
+        dead = np.zeros(n, dtype=bool)
 
-        for proj in feathershot_platforms:
-            if proj.is_platform and self.rect.colliderect(proj.rect):
-                proj.kill()
-                self.kill()
+        # Each feathershot platform is destroyed by the first droplet (in group
+        # order) that touches it, and that droplet is used up with it
+        targets = feathershot_platforms.platform_sprites()
+        if targets:
+            hits = sweep(left0, top0, left, top, width, height, rect_array(targets)) < 1
+            for p in np.flatnonzero(hits.any(axis=0)).tolist():
+                targets[p].kill()
+                dead[np.argmax(hits[:, p])] = True
 
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                self.kill()
+        if grid:
+            platforms = grid.platforms.query(self.swept_bounds(rows, left0, top0))
+        boxes = rect_array(list(platforms))
+        if len(boxes):
+            dead |= (sweep(left0, top0, left, top, width, height, boxes) < 1).any(axis=1)
 
-        if self.rect.top > HEIGHT:
-            self.kill()
\ No newline at end of file
+        dead |= top > HEIGHT
+        self.write_rects(rows)
+        for i in np.flatnonzero(dead).tolist():
+            members[i].kill()
@@ -0,0 +1,116 @@
+# classes/aim.py
+# Predicted flight path for the shot being charged, using the same per-frame
+# rules as ProjectileGroup.update so the preview matches what will happen
+from functools import lru_cache
+import numpy as np
+from config.config import WIDTH, HEIGHT, WHITE, TICK, TICK_RATE, ammo_colors, ammo_gravity, ammo_max_bounces
+from classes.projectile import launch_velocity
+from classes.batch import rect_array, sweep, sweep_box
+from classes.surface_cache import circle_surface
+
+MAX_STEPS = 5 * TICK_RATE  # Five seconds of flight
+SIZE = 10  # Projectile rect size
+DOT_EVERY = max(1, round(2 / TICK))  # A dot every 30th of a second of flight
+INF = float("inf")
+
+
+@lru_cache(maxsize=64)
+def predict(x, y, vx, vy, ammo_type, platforms, feathershot_platforms, max_steps=MAX_STEPS):
+    # Step a single projectile for up to `max_steps` frames. `platforms` and
+    # `feathershot_platforms` are tuples of (left, top, right, bottom).
+    # Returns an (n, 7) array with a row per frame it is alive: its rect's
+    # (left, top) at the start of the frame and after moving, the time of
+    # impact with a platform (inf if none), and its (left, top) after landing
+    # or bouncing; plus whether it came to rest rather than leaving the
+    # screen. Cached arrays are shared, so callers must not modify them.
+    gravity = ammo_gravity[ammo_type]
+    max_bounces = ammo_max_bounces[ammo_type]
+    bouncy = max_bounces > 0
+    boxes = platforms + feathershot_platforms if bouncy else platforms  # Only bouncy ammo sees feathershot platforms
+    bounces = 0
+    left = int(x) - SIZE // 2
+    top = int(y) - SIZE // 2
+    steps = []
+    stopped = False
+    for _ in range(max_steps):
+        left0 = left
+        top0 = top
+        x += vx * TICK
+        y += vy * TICK
+        vy += gravity * TICK
+        left = int(x) - SIZE // 2
+        top = int(y) - SIZE // 2
+        # Same contact rule as ProjectileGroup._platform_contacts
+        impact = INF
+        surface = 0
+        if vy > 0:
+            for box in boxes:
+                if top0 + SIZE <= box[1]:
+                    t = sweep_box(left0, top0, left, top, SIZE, SIZE, box)
+                    if t is not None and t < impact:
+                        impact = t
+                        surface = box[1]
+        moved = (left, top)
+        if impact < INF:
+            x -= vx * TICK * (1 - impact)
+            y = surface - SIZE + SIZE // 2
+            left = int(x) - SIZE // 2
+            top = surface - SIZE
+            if bouncy:
+                vy = -vy * 0.8
+                bounces += 1
+            stopped = bounces >= max_bounces
+        if left > WIDTH or left + SIZE < 0 or top > HEIGHT:
+            break
+        steps.append((left0, top0, *moved, impact, left, top))
+        if stopped:
+            break
+    return np.array(steps, dtype=np.float64).reshape(-1, 7), stopped
+
+
+def predicted_path(world, mouse_pos, max_steps=MAX_STEPS):
+    # (lefts, tops, stopped) for the shot that would be fired now, cut short
+    # where a non-piercing shot would hit the snake; None if it can't be aimed
+    player = world.player
+    ammo_type = player.current_ammo
+    cx, cy = player.rect.center
+    velocity = launch_velocity(ammo_type, mouse_pos[0] - cx, mouse_pos[1] - cy, world.power)
+    if velocity is None:
+        return None
+    platforms = tuple(tuple(box) for box in rect_array(list(world.platforms)).tolist())
+    feathershot = ()
+    if ammo_type == "bouncy":
+        feathershot = tuple(tuple(box) for box in rect_array(world.projectiles.platform_sprites()).tolist())
+    steps, stopped = predict(cx, cy, *velocity, ammo_type, platforms, feathershot, max_steps)
+    lefts = steps[:, 5].astype(np.int64)
+    tops = steps[:, 6].astype(np.int64)
+
+    segments = world.segments()
+    if ammo_type != "piercing" and segments and len(steps):
+        size = np.full(len(steps), SIZE)
+        times = sweep(steps[:, 0], steps[:, 1], steps[:, 2], steps[:, 3], size, size, rect_array(segments))
+        hits = (times < steps[:, 4:5]).any(axis=1)
+        if hits.any():
+            end = int(np.argmax(hits)) + 1
+            return lefts[:end], tops[:end], True
+    return lefts, tops, stopped
+
+
+def draw_aim(screen, world, mouse_pos, max_steps=MAX_STEPS, every=DOT_EVERY):
+    # Blit the first `max_steps` frames of the path, a dot every `every`
+    # frames, in one call. Returns the rects drawn.
+    path = predicted_path(world, mouse_pos, max_steps)
+    if path is None:
+        return []
+    lefts, tops, stopped = path
+    if not len(lefts):
+        return []
+    dot = circle_surface(2, WHITE)
+    offset = SIZE // 2 - 2
+    centers = np.stack((lefts[::every], tops[::every]), axis=1) + offset
+    blits = [(dot, point) for point in centers.tolist()]
+    if stopped:
+        # Mark where the shot comes to rest or hits the snake
+        marker = circle_surface(5, ammo_colors[world.player.current_ammo])
+        blits.append((marker, (int(lefts[-1]), int(tops[-1]))))
+    return screen.blits(blits)
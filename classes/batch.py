@@ -0,0 +1,186 @@
+# classes/batch.py
+# Struct-of-arrays storage for sprites that are updated in bulk
+import numpy as np
+import pygame
+
+
+class BatchField:
+    # Sprite attribute that lives in the owning BatchGroup's arrays while the
+    # sprite is in one, and in the sprite's own __dict__ otherwise.
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, sprite, owner=None):
+        if sprite is None:
+            return self
+        if sprite.batch is None:
+            return sprite.__dict__[self.name]
+        return getattr(sprite.batch, self.name)[sprite.slot].item()
+
+    def __set__(self, sprite, value):
+        if sprite.batch is None:
+            sprite.__dict__[self.name] = value
+        else:
+            getattr(sprite.batch, self.name)[sprite.slot] = value
+
+
+def rect_array(sprites):
+    # (n, 4) array of left, top, right, bottom for a list of sprites
+    boxes = np.empty((len(sprites), 4), dtype=np.int64)
+    for i, sprite in enumerate(sprites):
+        rect = sprite.rect
+        boxes[i] = (rect.left, rect.top, rect.right, rect.bottom)
+    return boxes
+
+
+def sweep(left0, top0, left1, top1, width, height, boxes):
+    # Swept Rect.colliderect for every (row, box) pair at once: each row moves
+    # in a straight line from (left0, top0) to (left1, top1) over the frame.
+    # Returns the time of impact in [0, 1) for every pair, or inf where they
+    # never overlap (strictly, as in colliderect) during the frame.
+    enter_x, exit_x = _slab(left0[:, None], (left1 - left0)[:, None], width[:, None], boxes[:, 0], boxes[:, 2])
+    enter_y, exit_y = _slab(top0[:, None], (top1 - top0)[:, None], height[:, None], boxes[:, 1], boxes[:, 3])
+    enter = np.maximum(enter_x, enter_y)
+    hit = (enter < np.minimum(exit_x, exit_y)) & (enter < 1) & (exit_x > 0) & (exit_y > 0)
+    return np.where(hit, np.maximum(enter, 0), np.inf)
+
+
+def _slab(start, delta, size, low, high):
+    # Open interval of t where start + delta * t overlaps (low - size, high) on one axis
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t0 = (low - size - start) / delta
+        t1 = (high - start) / delta
+    still = delta == 0
+    inside = (start > low - size) & (start < high)
+    enter = np.where(still, np.where(inside, -np.inf, np.inf), np.minimum(t0, t1))
+    exit = np.where(still, np.where(inside, np.inf, -np.inf), np.maximum(t0, t1))
+    return enter, exit
+
+
+def sweep_box(left0, top0, left1, top1, width, height, box):
+    # sweep() for a single rect and box, without NumPy overhead
+    enter = 0.0
+    exit = 1.0
+    for start, delta, size, low, high in ((left0, left1 - left0, width, box[0], box[2]),
+                                          (top0, top1 - top0, height, box[1], box[3])):
+        if delta == 0:
+            if not low - size < start < high:
+                return None
+            continue
+        t0 = (low - size - start) / delta
+        t1 = (high - start) / delta
+        if t0 > t1:
+            t0, t1 = t1, t0
+        enter = max(enter, t0)
+        exit = min(exit, t1)
+    if enter < exit and enter < 1 and exit > 0:
+        return enter
+    return None
+
+
+class BatchGroup(pygame.sprite.Group):
+    # Sprite group that keeps its members' hot state as NumPy arrays so the
+    # whole group can be integrated in a few array operations per frame.
+    # Row i of every array belongs to members[i]; rows stay in the order the
+    # sprites were added, which is also the order the group iterates in.
+    fields = {}  # Name -> dtype of every BatchField on the sprite class
+    extra = {}  # Name -> dtype of columns only the group itself uses
+
+    def __init__(self, *sprites, capacity=64):
+        self.capacity = capacity
+        self.members = []
+        self.has_dead = False
+        self.columns = dict(self.fields, **self.extra, left=np.int64, top=np.int64, width=np.int64, height=np.int64)
+        for name, dtype in self.columns.items():
+            setattr(self, name, np.zeros(capacity, dtype))
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if len(self.members) == self.capacity:
+            self._grow()
+        i = len(self.members)
+        self.members.append(sprite)
+        for name in self.fields:
+            getattr(self, name)[i] = sprite.__dict__.pop(name)
+        sprite.batch = self
+        sprite.slot = i
+        self.sync_rect(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        # Hand the final state back to the sprite so it stays readable after kill()
+        i = sprite.slot
+        for name in self.fields:
+            sprite.__dict__[name] = getattr(self, name)[i].item()
+        sprite.batch = None
+        sprite.slot = None
+        self.members[i] = None
+        self.has_dead = True
+
+    def sync_rect(self, sprite):
+        # Call after changing a member's rect outside of update()
+        rect = sprite.rect
+        i = sprite.slot
+        self.left[i] = rect.left
+        self.top[i] = rect.top
+        self.width[i] = rect.width
+        self.height[i] = rect.height
+
+    def compact(self):
+        # Drop the rows of removed sprites, keeping the survivors in order
+        if not self.has_dead:
+            return len(self.members)
+        keep = [i for i, sprite in enumerate(self.members) if sprite is not None]
+        rows = np.array(keep, dtype=np.intp)
+        for name in self.columns:
+            column = getattr(self, name)
+            column[:len(keep)] = column[rows]
+        self.members = [self.members[i] for i in keep]
+        for i, sprite in enumerate(self.members):
+            sprite.slot = i
+        self.has_dead = False
+        return len(self.members)
+
+    def query(self, rect):
+        # Live members overlapping rect, in group order (same interface as SpatialHash)
+        n = len(self.members)
+        if not n:
+            return []
+        left = self.left[:n]
+        top = self.top[:n]
+        hit = ((left < rect.right) & (left + self.width[:n] > rect.left) &
+               (top < rect.bottom) & (top + self.height[:n] > rect.top))
+        members = self.members
+        return [members[i] for i in np.flatnonzero(hit).tolist() if members[i] is not None]
+
+    def bounds(self, rows):
+        # Rect covering the given rows, for one broadphase query per frame
+        left = self.left[rows].min().item()
+        top = self.top[rows].min().item()
+        right = (self.left[rows] + self.width[rows]).max().item()
+        bottom = (self.top[rows] + self.height[rows]).max().item()
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def swept_bounds(self, rows, left0, top0):
+        # bounds() also covering where the rows started the frame
+        rect = self.bounds(rows)
+        left = left0.min().item()
+        top = top0.min().item()
+        return rect.union(pygame.Rect(left, top, (left0 + self.width[rows]).max().item() - left,
+                                      (top0 + self.height[rows]).max().item() - top))
+
+    def write_rects(self, rows):
+        # Copy the rect arrays back onto the sprites for drawing
+        members = self.members
+        for i, left, top in zip(rows.tolist(), self.left[rows].tolist(), self.top[rows].tolist()):
+            sprite = members[i]
+            if sprite is not None:
+                sprite.rect.topleft = (left, top)
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, dtype in self.columns.items():
+            column = np.zeros(self.capacity, dtype)
+            column[:len(self.members)] = getattr(self, name)[:len(self.members)]
+            setattr(self, name, column)
@@ -0,0 +1,118 @@
+# classes/bot.py
+# Scripted player for headless games: dodges acid, picks up spent shots and
+# fires at the snake's tail with a ballistic aim
+import math
+import random
+import pygame
+from config.config import TICK, velocity_multipliers, ammo_gravity
+from classes.world import FrameInput
+
+AMMO_KEYS = {"regular": pygame.K_1, "bouncy": pygame.K_2, "piercing": pygame.K_3}
+AMMO_PREFERENCE = ("piercing", "regular", "bouncy")  # Feathershot is kept for platforms
+DODGE_DISTANCE = 70  # Horizontal distance at which a falling droplet is avoided
+STAND_OFF = 250  # Preferred horizontal distance from the snake's tail
+
+
+class BotPlayer:
+    # Callable(frame) -> FrameInput, so it can drive World.run directly.
+    # `aim_error` is the standard deviation of its aim in degrees, and
+    # `cooldown` the 60ths of a second it waits between shots.
+    def __init__(self, world, seed=None, power=100, aim_error=3.0, cooldown=20):
+        self.world = world
+        self.rng = random.Random(seed)
+        self.power = power
+        self.aim_error = aim_error
+        self.cooldown = cooldown
+        self.wait = 0
+        self.shots = 0
+
+    def __call__(self, frame):
+        world = self.world
+        player = world.player
+        events = []
+        held = []
+
+        ammo = self.pick_ammo()
+        if ammo and ammo != player.current_ammo:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=AMMO_KEYS[ammo], mod=0))
+
+        direction = self.move_direction(ammo)
+        if direction < 0:
+            held.append(pygame.K_a)
+        elif direction > 0:
+            held.append(pygame.K_d)
+
+        self.wait = max(0, self.wait - 1)
+        if world.charging:
+            if world.power >= self.power:
+                target = self.aim(ammo or player.current_ammo)
+                if target:
+                    events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=target))
+                    self.shots += 1
+                    self.wait = round(self.cooldown / TICK)
+        elif ammo and not self.wait and self.aim(ammo):
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=player.rect.center))
+        return FrameInput(events, held)
+
+    def pick_ammo(self):
+        counts = self.world.player.ammo_counts
+        for ammo in AMMO_PREFERENCE:
+            if counts.get(ammo, 0) > 0:
+                return ammo
+        return None
+
+    def move_direction(self, ammo):
+        player = self.world.player.rect
+        # Step out from under any droplet that is still above us
+        for acid in self.world.acid_group:
+            if acid.rect.bottom < player.top and abs(acid.rect.centerx - player.centerx) < DODGE_DISTANCE:
+                return 1 if acid.rect.centerx <= player.centerx else -1
+        if not ammo:
+            # Out of ammo: walk to the nearest spent shot on the ground
+            spent = [proj for proj in self.world.projectiles if proj.stopped and not proj.is_platform]
+            if spent:
+                nearest = min(spent, key=lambda proj: abs(proj.rect.centerx - player.centerx))
+                return self.toward(nearest.rect.centerx)
+            return 0
+        tail = self.world.snake.segments[-1].rect
+        side = -1 if tail.centerx > player.centerx else 1
+        return self.toward(tail.centerx + side * STAND_OFF)
+
+    def toward(self, x):
+        dx = x - self.world.player.rect.centerx
+        if abs(dx) < 10:
+            return 0
+        return 1 if dx > 0 else -1
+
+    def aim(self, ammo):
+        # Mouse position that launches `ammo` at full charge onto the tail
+        # segment (led by the snake's velocity), or None if out of range
+        world = self.world
+        cx, cy = world.player.rect.center
+        v = self.power * 0.2 * velocity_multipliers.get(ammo, 1.0)
+        g = ammo_gravity[ammo]
+        tail = world.snake.segments[-1].rect
+        vx, vy = world.snake.velocity
+        tx, ty = tail.center
+        angle = None
+        for _ in range(3):
+            angle = launch_angle(tx - cx, ty - cy, v, g)
+            if angle is None:
+                return None
+            flight = abs(tx - cx) / max(abs(v * math.cos(angle)), 1e-6)
+            tx, ty = tail.centerx + vx * flight, tail.centery + vy * flight
+        angle += math.radians(self.rng.gauss(0, self.aim_error))
+        return (int(cx + 100 * math.cos(angle)), int(cy + 100 * math.sin(angle)))
+
+
+def launch_angle(dx, dy, v, g):
+    # Screen-space angle (y down) of the flatter arc that passes through
+    # (dx, dy) at speed v under gravity g per frame, or None if out of reach
+    up = -dy
+    if dx == 0:
+        return -math.pi / 2 if up >= 0 else math.pi / 2
+    root = v**4 - g * (g * dx * dx + 2 * up * v * v)
+    if root < 0:
+        return None
+    elevation = math.atan2(v * v - math.sqrt(root), g * abs(dx))
+    return math.atan2(-math.sin(elevation), math.copysign(math.cos(elevation), dx))
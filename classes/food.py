@@ -2,10 +2,48 @@
 import pygame
 import random
 from config.config import ORANGE, WIDTH, HEIGHT
+from classes.surface_cache import solid_surface
+from classes.pool import Pool, PooledSprite
+from classes.spatial_hash import IncrementalHash
 
-class Food(pygame.sprite.Sprite):
-    def __init__(self):
+class Food(PooledSprite):
+    def __init__(self, center=None):
         super().__init__()
-        self.image = pygame.Surface((20, 20))
-        self.image.fill(ORANGE)
-        self.rect = self.image.get_rect(center=(random.randint(50, WIDTH - 50), random.randint(50, HEIGHT - 50)))
\ No newline at end of file
+        self.image = solid_surface((20, 20), ORANGE)
+        self.rect = self.image.get_rect()
+        self.reuse(center)
+
+    def reuse(self, center=None):
+        # Move to `center`, or a random spot; called by food_pool.acquire() on eaten food
+        self.rect.center = center or (random.randint(50, WIDTH - 50), random.randint(50, HEIGHT - 50))
+
+
+food_pool = Pool(Food)
+
+
+class FoodGroup(pygame.sprite.Group):
+    # Indexes its food as it is added and removed, so collision queries and
+    # nearest-food lookups don't scan the whole group (food never moves)
+    def __init__(self, *sprites, level=None):
+        self.index = IncrementalHash()
+        self.level = level  # Its food zones decide where spawn() puts new food
+        super().__init__(*sprites)
+
+    def spawn(self):
+        food = food_pool.acquire(self.level.food_position() if self.level else None)
+        self.add(food)
+        return food
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.index.insert(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.index.remove(sprite)
+
+    def query(self, rect):
+        return self.index.query(rect)
+
+    def nearest(self, x, y):
+        return self.index.nearest(x, y)
\ No newline at end of file
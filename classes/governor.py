@@ -0,0 +1,58 @@
+# classes/governor.py
+# Keeps frames inside their budget by trading away optional visual detail.
+# Game speed is held by the fixed timestep, so a frame that overruns costs
+# smoothness and a burst of catch-up ticks instead; the governor watches how
+# long each frame's update and draw take and steps through GOVERNOR_LEVELS
+# (coarser aim preview, culling sprites off the screen) until they fit, then
+# steps back once there is headroom again.
+# The budget is a 60 FPS frame whatever RENDER_FPS is: higher frame rates are
+# best effort and never bought by dropping detail.
+import logging
+import time
+from config.config import GOVERNOR_LEVELS, GOVERNOR_HIGH, GOVERNOR_LOW, GOVERNOR_RECOVER
+
+BUDGET = 1 / 60
+SMOOTHING = 0.1  # Weight of the newest frame in the moving average
+SETTLE = 30  # Frames to wait after a change before stepping down again
+
+
+class FrameGovernor:
+    # `detail` is the current entry of GOVERNOR_LEVELS. A disabled governor
+    # always stays at full detail.
+    def __init__(self, budget=BUDGET, enabled=True):
+        self.budget = budget
+        self.enabled = enabled
+        self.level = 0
+        self.detail = GOVERNOR_LEVELS[0]
+        self.average = 0.0  # Smoothed seconds of work per frame
+        self.calm = 0  # Frames in a row below the recovery threshold
+        self.settle = 0
+        self.frame_start = time.perf_counter()
+
+    def start_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        # Call once the frame is drawn, before sleeping until the next one
+        if not self.enabled:
+            return
+        work = time.perf_counter() - self.frame_start
+        self.average += (work - self.average) * SMOOTHING
+        self.settle = max(0, self.settle - 1)
+        if self.average > self.budget * GOVERNOR_HIGH:
+            self.calm = 0
+            if not self.settle and self.level < len(GOVERNOR_LEVELS) - 1:
+                self.set_level(self.level + 1)
+        elif self.average < self.budget * GOVERNOR_LOW:
+            self.calm += 1
+            if self.calm >= GOVERNOR_RECOVER and self.level > 0:
+                self.set_level(self.level - 1)
+        else:
+            self.calm = 0
+
+    def set_level(self, level):
+        logging.info("Frame governor: detail level %d -> %d (%.1f ms per frame)", self.level, level, self.average * 1000)
+        self.level = level
+        self.detail = GOVERNOR_LEVELS[level]
+        self.calm = 0
+        self.settle = SETTLE
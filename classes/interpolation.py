@@ -0,0 +1,25 @@
+# classes/interpolation.py
+# Drawing between simulation ticks. The renderer blends each moving sprite's
+# position from the tick before the latest one towards the latest one, by how
+# far the clock has got into the next tick.
+JUMP = 64  # Pixels; a sprite that moved further in one tick was respawned or reused, so isn't blended
+
+
+def capture_positions(world):
+    # Top-left corners of every moving sprite, taken just before a tick
+    positions = {}
+    for group in (world.segments(), world.player_group, world.projectiles, world.acid_group):
+        for sprite in group:
+            positions[sprite] = sprite.rect.topleft
+    return positions
+
+
+def interpolate(rect, previous, alpha):
+    # `rect` moved back towards `previous` by (1 - alpha) of the step between them
+    if previous is None:
+        return rect
+    dx = previous[0] - rect.left
+    dy = previous[1] - rect.top
+    if abs(dx) > JUMP or abs(dy) > JUMP:
+        return rect
+    return rect.move(round(dx * (1 - alpha)), round(dy * (1 - alpha)))
@@ -0,0 +1,102 @@
+# classes/latency.py
+# Input latency: how long mouse and keyboard events take to reach the
+# simulation and then the screen. SDL events carry no timestamp here, so each
+# event is stamped when the game loop first polls it; the time between polls
+# is tracked too, as the longest an event can have queued before its stamp.
+import logging
+import time
+import numpy as np
+import pygame
+
+TRACKED = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN, pygame.KEYUP)
+BUCKET_MS = 1  # Histogram bucket width
+GAP_BUCKETS = 100  # Poll gaps are binned as they arrive; the last bucket holds everything longer
+SLICE = 0.001  # Seconds between polls while waiting to latch input
+
+
+class InputLatency:
+    # poll() stamps events, stepped() marks the stamped events as simulated,
+    # drawn() as on screen. Every call is a no-op while disabled, apart from
+    # poll() handing the events back.
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.unsimulated = []  # Stamps of events polled but not yet simulated
+        self.unshown = []  # Stamps of events simulated but not yet flipped
+        self.to_simulation = []  # Seconds from stamp to the end of the tick that used the event
+        self.to_flip = []  # Seconds from stamp to the flip that showed its result
+        self.gaps = np.zeros(GAP_BUCKETS, dtype=np.int64)  # Polls per BUCKET_MS of gap since the previous one
+        self.gap_total = 0.0  # Seconds between polls, summed for the mean
+        self.gap_count = 0
+        self.last_poll = None
+
+    def poll(self, events):
+        if self.enabled:
+            now = time.perf_counter()
+            if self.last_poll is not None:
+                gap = now - self.last_poll
+                self.gaps[min(int(gap * 1000 / BUCKET_MS), GAP_BUCKETS - 1)] += 1
+                self.gap_total += gap
+                self.gap_count += 1
+            self.last_poll = now
+            self.unsimulated += [now for event in events if event.type in TRACKED]
+        return events
+
+    def stepped(self):
+        if not self.enabled or not self.unsimulated:
+            return
+        now = time.perf_counter()
+        self.to_simulation += [now - stamp for stamp in self.unsimulated]
+        self.unshown += self.unsimulated
+        self.unsimulated = []
+
+    def drawn(self):
+        if not self.enabled or not self.unshown:
+            return
+        now = time.perf_counter()
+        self.to_flip += [now - stamp for stamp in self.unshown]
+        self.unshown = []
+
+    def discard(self):
+        # Forget events that will never reach the simulation (menus, rewind)
+        self.unsimulated = []
+
+    def summary(self):
+        lines = [f"Input latency over {len(self.to_flip)} events, polled every {self.gap_total / max(self.gap_count, 1) * 1000:.2f} ms on average"]
+        for name, samples in (("to simulation", self.to_simulation), ("to flip", self.to_flip)):
+            if samples:
+                ms = np.array(samples) * 1000
+                lines.append(f"  {name:14s} mean {ms.mean():6.2f}  p50 {np.percentile(ms, 50):6.2f}  "
+                             f"p95 {np.percentile(ms, 95):6.2f}  p99 {np.percentile(ms, 99):6.2f}  max {ms.max():6.2f} ms")
+        return lines
+
+    def histograms(self):
+        # (bucket starts in ms, events per bucket to simulation, to flip, polls per gap bucket)
+        series = [np.array(samples) * 1000 for samples in (self.to_simulation, self.to_flip)]
+        used = np.flatnonzero(self.gaps)
+        top = max([s.max() for s in series if len(s)] + [(used[-1] if len(used) else 0) * BUCKET_MS])
+        edges = np.arange(0, top + 2 * BUCKET_MS, BUCKET_MS)
+        gaps = np.zeros(len(edges) - 1, dtype=np.int64)
+        gaps[:min(len(gaps), GAP_BUCKETS)] = self.gaps[:len(gaps)]
+        return (edges[:-1], *(np.histogram(s, edges)[0] for s in series), gaps)
+
+    def dump(self, path):
+        # Log the summary and write the histograms as CSV
+        for line in self.summary():
+            logging.info(line)
+        starts, simulation, flip, gaps = self.histograms()
+        with open(path, "w") as f:
+            f.write("bucket_ms,to_simulation,to_flip,poll_gaps\n")
+            for row in zip(starts.tolist(), simulation.tolist(), flip.tolist(), gaps.tolist()):
+                f.write(f"{row[0]:g},{row[1]},{row[2]},{row[3]}\n")
+
+
+def latch(due, latency):
+    # Late latching: wait until perf_counter() reaches `due`, polling input in
+    # short slices so it is stamped as it arrives, and return all of it
+    events = []
+    while True:
+        events += latency.poll(pygame.event.get())
+        remaining = due - time.perf_counter()
+        if remaining <= 0:
+            return events
+        time.sleep(min(remaining, SLICE))
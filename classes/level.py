@@ -0,0 +1,168 @@
+# classes/level.py
+# Level files: static platforms, spawn points and food spawn zones. Levels are
+# authored as JSON and baked once into merged rectangles plus a tile grid of
+# which rectangles touch each tile, saved next to the JSON as .baked.npz.
+import json
+import os
+import random
+from functools import lru_cache
+import numpy as np
+from config.config import WIDTH, HEIGHT
+
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "levels")
+TILE = 32  # Size of a baked grid tile in pixels
+BAKED_VERSION = 1
+
+
+def level_path(name):
+    # "default" -> levels/default.json; anything with a .json suffix is used as given
+    return name if name.endswith(".json") else os.path.join(LEVEL_DIR, f"{name}.json")
+
+
+def merge_rects(rects):
+    # Merge rectangles that share a whole edge (or overlap along it) into one,
+    # first along rows and then down columns, until nothing more merges
+    rects = sorted(tuple(rect) for rect in rects)
+    while True:
+        merged = _merge_runs(rects, horizontal=True)
+        merged = _merge_runs(merged, horizontal=False)
+        if len(merged) == len(rects):
+            return merged
+        rects = merged
+
+
+def _merge_runs(rects, horizontal):
+    # One pass: rects with the same (y, h) that touch in x, or the same (x, w) that touch in y
+    if horizontal:
+        key = lambda r: (r[1], r[3], r[0])
+    else:
+        key = lambda r: (r[0], r[2], r[1])
+    out = []
+    for x, y, w, h in sorted(rects, key=key):
+        if out:
+            px, py, pw, ph = out[-1]
+            if horizontal and py == y and ph == h and x <= px + pw:
+                out[-1] = (px, py, max(px + pw, x + w) - px, ph)
+                continue
+            if not horizontal and px == x and pw == w and y <= py + ph:
+                out[-1] = (px, py, pw, max(py + ph, y + h) - py)
+                continue
+        out.append((x, y, w, h))
+    return sorted(out, key=lambda r: (r[1], r[0]))
+
+
+def bake(source):
+    # Level data as arrays: merged rects, the tile grid in CSR form (the rect
+    # indices touching tile i are items[starts[i]:starts[i + 1]]) and spawns
+    with open(source) as f:
+        data = json.load(f)
+    rects = np.array(merge_rects(data.get("platforms", [])), dtype=np.int64).reshape(-1, 4)
+    width, height = data.get("size", (WIDTH, HEIGHT))
+    columns = -(-width // TILE)
+    rows = -(-height // TILE)
+    cells = [[] for _ in range(columns * rows)]
+    for i, (x, y, w, h) in enumerate(rects.tolist()):
+        # Clamped to the grid; anything off the edges lands in the border tiles
+        x0 = min(max(x // TILE, 0), columns - 1)
+        x1 = min(max((x + w - 1) // TILE, 0), columns - 1)
+        y0 = min(max(y // TILE, 0), rows - 1)
+        y1 = min(max((y + h - 1) // TILE, 0), rows - 1)
+        for ty in range(y0, y1 + 1):
+            for tx in range(x0, x1 + 1):
+                cells[ty * columns + tx].append(i)
+    starts = np.zeros(len(cells) + 1, dtype=np.int32)
+    starts[1:] = np.cumsum([len(cell) for cell in cells])
+    items = np.array([i for cell in cells for i in cell], dtype=np.int32)
+    return {
+        "version": np.array(BAKED_VERSION),
+        "size": np.array((width, height)),
+        "rects": rects,
+        "starts": starts,
+        "items": items,
+        "player_spawn": np.array(data.get("player_spawn", (width // 2, height - 50))),
+        "snake_spawn": np.array(data.get("snake_spawn", (width / 2, height / 2))),
+        "food_zones": np.array(data.get("food_zones", [(50, 50, width - 100, height - 100)]), dtype=np.int64).reshape(-1, 4),
+    }
+
+
+def baked_path(source):
+    return os.path.splitext(source)[0] + ".baked.npz"
+
+
+def bake_file(source):
+    # Bake source and save it next to it; returns the baked arrays
+    arrays = bake(source)
+    np.savez(baked_path(source), **arrays)
+    return arrays
+
+
+@lru_cache(maxsize=16)
+def load_level(name):
+    # Loads the baked level, baking it first if it is missing or older than
+    # its JSON. Levels are read-only and shared by every World that uses them.
+    source = level_path(name)
+    baked = baked_path(source)
+    arrays = None
+    if os.path.exists(baked) and os.path.getmtime(baked) >= os.path.getmtime(source):
+        with np.load(baked) as f:
+            if f["version"] == BAKED_VERSION:
+                arrays = {key: f[key] for key in f.files}
+    if arrays is None:
+        try:
+            arrays = bake_file(source)
+        except OSError:
+            arrays = bake(source)  # Read-only install: bake in memory every run
+    return Level(arrays)
+
+
+class Level:
+    def __init__(self, arrays):
+        self.width, self.height = arrays["size"].tolist()
+        self.columns = -(-self.width // TILE)
+        self.rows = -(-self.height // TILE)
+        self.rects = [tuple(rect) for rect in arrays["rects"].tolist()]
+        starts = arrays["starts"].tolist()
+        items = arrays["items"].tolist()
+        self.cells = [tuple(items[starts[i]:starts[i + 1]]) for i in range(len(starts) - 1)]
+        self.occupied = np.diff(arrays["starts"]).reshape(self.rows, self.columns) > 0
+        self.player_spawn = tuple(int(v) for v in arrays["player_spawn"].tolist())
+        self.snake_spawn = tuple(float(v) for v in arrays["snake_spawn"].tolist())
+        self.food_zones = [tuple(zone) for zone in arrays["food_zones"].tolist()]
+        self.zone_weights = [w * h for _, _, w, h in self.food_zones]
+
+    def food_position(self):
+        # Random point in a food zone (zones picked by area)
+        if len(self.food_zones) == 1:
+            x, y, w, h = self.food_zones[0]
+        else:
+            x, y, w, h = random.choices(self.food_zones, self.zone_weights)[0]
+        return (random.randint(x, x + w), random.randint(y, y + h))
+
+
+class StaticGeometry:
+    # A World's level platforms, looked up through the level's baked tile
+    # grid instead of being re-indexed every frame. Answers query(rect) like
+    # the other CollisionIndex layers.
+    def __init__(self, level, sprites):
+        self.level = level
+        self.sprites = sprites  # One Platform per merged rect, in rect order
+
+    def query(self, rect):
+        level = self.level
+        x0 = min(max(rect.left // TILE, 0), level.columns - 1)
+        x1 = min(max((rect.right - 1) // TILE, 0), level.columns - 1)
+        y0 = min(max(rect.top // TILE, 0), level.rows - 1)
+        y1 = min(max((rect.bottom - 1) // TILE, 0), level.rows - 1)
+        if not level.occupied[y0:y1 + 1, x0:x1 + 1].any():
+            return []
+        found = set()
+        cells = level.cells
+        columns = level.columns
+        for ty in range(y0, y1 + 1):
+            for i in cells[ty * columns + x0:ty * columns + x1 + 1]:
+                found.update(i)
+        sprites = self.sprites
+        return [sprites[i] for i in sorted(found)]
+
+    def __iter__(self):
+        return iter(self.sprites)
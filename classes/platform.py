@@ -1,10 +1,10 @@
 # classes/platform.py
 import pygame
 from config.config import GREY
+from classes.surface_cache import solid_surface
 
 class Platform(pygame.sprite.Sprite):
     def __init__(self, x, y, w, h):
         super().__init__()
-        self.image = pygame.Surface((w, h))
-        self.image.fill(GREY)
+        self.image = solid_surface((w, h), GREY)
         self.rect = self.image.get_rect(topleft=(x, y))
\ No newline at end of file
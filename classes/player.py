@@ -1,15 +1,17 @@
 # classes/player.py
 import pygame
+import math
 import logging  # Import logging module
-from config.config import WHITE, WIDTH, HEIGHT, velocity_multipliers
-from classes.projectile import Projectile
+from config.config import WHITE, WIDTH, HEIGHT, TICK, TICK_RATE, starting_ammo, balance
+from classes.projectile import projectile_pool, launch_velocity
+from classes.surface_cache import solid_surface
+from config.logging_setup import UNSAMPLED
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self):
+    def __init__(self, spawn=(WIDTH // 2, HEIGHT - 50)):
         super().__init__()
-        self.image = pygame.Surface((40, 40))
-        self.image.fill(WHITE)
-        self.rect = self.image.get_rect(center=(WIDTH // 2, HEIGHT - 50))
+        self.image = solid_surface((40, 40), WHITE)
+        self.rect = self.image.get_rect(center=spawn)
         self.speed = 5
         self.jump_power = -12
         self.vy = 0
@@ -18,24 +20,26 @@ class Player(pygame.sprite.Sprite):
         self.health = 100
         self.current_ammo = "regular"
         self.ammo_types = ["regular", "bouncy", "piercing", "feathershot"]
-        self.ammo_counts = {"regular": 10, "bouncy": 5, "piercing": 3, "feathershot": 2}
+        self.ammo_counts = dict(starting_ammo)
         self.last_y = self.rect.y
         self.on_food = False  # Flag for standing on food
         self.on_feathershot = False  # Flag for standing on feathershot platform
+        self.carry = [0.0, 0.0]  # Sub-pixel movement left over from the last tick (off at 60 Hz)
 
-    def update(self, keys, platforms, projectiles, snake_segments, acid_group, food_group):
+    def update(self, keys, platforms, projectiles, snake_segments, acid_group, food_group, grid=None):
         # Handle horizontal movement
+        dx = 0
         if keys[pygame.K_a]:
-            self.rect.x -= self.speed
+            dx -= self.speed * TICK
         if keys[pygame.K_d]:
-            self.rect.x += self.speed
+            dx += self.speed * TICK
         if keys[pygame.K_SPACE] and self.on_ground:
             self.vy = self.jump_power
             self.on_ground = False
 
         # Apply gravity
-        self.vy += self.gravity
-        self.rect.y += self.vy
+        self.vy += self.gravity * TICK
+        self.move(dx, self.vy * TICK)
 
         # Reset collision flags
         self.on_ground = False
@@ -43,15 +47,16 @@ class Player(pygame.sprite.Sprite):
         self.on_feathershot = False
 
         # Check collision with platforms
-        for platform in platforms:
+        for platform in (grid.platforms.query(self.rect) if grid else platforms):
             if self.rect.colliderect(platform.rect):
-                if self.vy > 0 and self.rect.bottom - self.vy <= platform.rect.top + 2:
+                if self.vy > 0 and self.rect.bottom - self.vy * TICK <= platform.rect.top + 2:
                     self.rect.bottom = platform.rect.top
                     self.vy = 0
+                    self.carry[1] = 0.0
                     self.on_ground = True
                     fall_height = self.last_y - self.rect.y
                     if fall_height > 100:
-                        damage = (fall_height / HEIGHT) * 45
+                        damage = (fall_height / HEIGHT) * balance["fall_damage"]
                         self.health -= damage
                         if self.health < 0:
                             self.health = 0
@@ -59,42 +64,44 @@ class Player(pygame.sprite.Sprite):
                     self.on_ground = True
 
         # Check collision with food (as platforms)
-        for food in food_group:
+        for food in (grid.food.query(self.rect) if grid else food_group):
             if self.vy > 0 and self.rect.bottom > food.rect.top and self.rect.bottom <= food.rect.top + 10 and self.rect.left < food.rect.right and self.rect.right > food.rect.left:
                 self.on_food = True
                 self.on_ground = True
                 self.vy = 0
+                self.carry[1] = 0.0
                 self.rect.bottom = food.rect.top
 
         # Check collision with feathershot platforms
-        for proj in projectiles:
+        for proj in (grid.resting.query(self.rect) if grid else projectiles):
             if proj.is_platform and self.vy > 0 and self.rect.bottom > proj.rect.top and self.rect.bottom <= proj.rect.top + 10 and self.rect.left < proj.rect.right and self.rect.right > proj.rect.left:
                 self.on_feathershot = True
                 self.on_ground = True
                 self.vy = 0
+                self.carry[1] = 0.0
                 self.rect.bottom = proj.rect.top
 
         self.last_y = self.rect.y
 
         # Apply damage or health regeneration
         if self.on_food:
-            self.health -= 2 / 60  # 2 HP per second damage
+            self.health -= 2 / TICK_RATE  # 2 HP per second damage
         if self.on_feathershot:
-            self.health += 1 / 60  # 1 HP per second regeneration
+            self.health += 1 / TICK_RATE  # 1 HP per second regeneration
         self.health = max(0, min(100, self.health))  # Clamp health between 0 and 100
-        logging.debug(f"Player health: {self.health}")
+        logging.debug("Player health: %s", self.health, extra=UNSAMPLED)
 
         # Check collisions with snake, acid, and pickups
-        for segment in snake_segments:
+        for segment in (grid.segments.query(self.rect) if grid else snake_segments):
             if self.rect.colliderect(segment.rect):
-                self.health -= 0.666
+                self.health -= 0.666 * TICK
 
-        for acid in acid_group:
+        for acid in (grid.acid.query(self.rect) if grid else acid_group):
             if self.rect.colliderect(acid.rect):
                 self.health -= 10
                 acid.kill()
 
-        for proj in projectiles:
+        for proj in (grid.resting.query(self.rect) if grid else projectiles):
             if proj.stopped and not proj.is_platform and self.rect.colliderect(proj.rect):
                 if proj.ammo_type in self.ammo_counts:
                     self.ammo_counts[proj.ammo_type] += 1
@@ -103,19 +110,31 @@ class Player(pygame.sprite.Sprite):
         # Keep player within screen bounds
         self.rect.clamp_ip(pygame.Rect(0, 0, WIDTH, HEIGHT))
 
+    def move(self, dx, dy):
+        # Move the rect by whole pixels. At 60 Hz each tick's move simply
+        # rounds, as the game was tuned. At other rates the fraction carries
+        # over to the next tick so speeds hold, and vertical moves round down
+        # the screen so the player still settles onto the ground every tick.
+        if TICK == 1:
+            self.rect.x += dx
+            self.rect.y += dy
+            return
+        dx += self.carry[0]
+        dy += self.carry[1]
+        step_x = round(dx)
+        step_y = math.ceil(dy)
+        self.rect.x += step_x
+        self.rect.y += step_y
+        self.carry = [dx - step_x, dy - step_y]
+
     def shoot(self, mx, my, power):
         if self.current_ammo in self.ammo_counts and self.ammo_counts[self.current_ammo] > 0:
             self.ammo_counts[self.current_ammo] -= 1
-            dx = mx - self.rect.centerx
-            dy = my - self.rect.centery
-            distance = (dx**2 + dy**2)**0.5
-            if distance > 0:
-                multiplier = velocity_multipliers.get(self.current_ammo, 1.0)
-                v = power * 0.2 * multiplier
-                vx = v * (dx / distance)
-                vy = v * (dy / distance)
+            velocity = launch_velocity(self.current_ammo, mx - self.rect.centerx, my - self.rect.centery, power)
+            if velocity:
+                vx, vy = velocity
                 logging.info(f"Shooting {self.current_ammo} projectile with power {power}")
-                return Projectile(self.rect.centerx, self.rect.centery, vx, vy, self.current_ammo)
+                return projectile_pool.acquire(self.rect.centerx, self.rect.centery, vx, vy, self.current_ammo)
         else:
             logging.warning(f"Cannot shoot: No ammo for {self.current_ammo}")
         return None
\ No newline at end of file
@@ -0,0 +1,72 @@
+# classes/pool.py
+# Free lists for entities that are created and destroyed all game long, and
+# optional garbage-collector freezing while the game is running
+import gc
+import pygame
+
+
+class Pool:
+    # acquire(*args) hands out a released object re-initialised with
+    # obj.reuse(*args), or builds a new one with factory(*args). Releasing
+    # the same object twice is harmless.
+    def __init__(self, factory, limit=1024):
+        self.factory = factory
+        self.limit = limit
+        self.free = []
+        self.created = 0
+
+    def prefill(self, count, *args):
+        # Build objects up front so the first frames don't have to
+        for obj in [self._build(*args) for _ in range(min(count, self.limit) - len(self.free))]:
+            self.release(obj)
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.pooled = False
+            obj.reuse(*args)
+            return obj
+        return self._build(*args)
+
+    def release(self, obj):
+        if obj.pooled or len(self.free) >= self.limit:
+            return
+        obj.pooled = True
+        self.free.append(obj)
+
+    def _build(self, *args):
+        obj = self.factory(*args)
+        obj.pool = self
+        obj.pooled = False
+        self.created += 1
+        return obj
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    # A sprite that goes back to its pool once it is killed
+    pool = None
+    pooled = False
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+def release_all(group):
+    # Group.empty() for pooled sprites
+    for sprite in group.sprites():
+        sprite.kill()
+
+
+def freeze_gc():
+    # Move everything allocated so far out of the collector's reach and stop
+    # automatic collections, so none can land in the middle of a frame
+    gc.collect()
+    gc.freeze()
+    gc.disable()
+
+
+def thaw_gc():
+    gc.unfreeze()
+    gc.enable()
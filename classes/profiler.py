@@ -0,0 +1,113 @@
+# classes/profiler.py
+# Per-stage frame timings, an on-screen overlay and trace export
+import json
+import time
+import numpy as np
+import pygame
+from config.config import WHITE, BLACK, GREEN, RED
+from classes.surface_cache import render_text
+
+# Frame stages in the order they run
+STAGES = ("latch", "input", "broadphase", "player", "snake", "acid", "projectiles", "rewind", "spectate",
+          "scene", "trajectory", "hud", "overlay", "flip", "sleep")
+BUDGET_MS = 1000 / 60
+
+
+class FrameProfiler:
+    # lap(stage) charges the time since the previous lap to `stage`. Timings
+    # for the last `history` frames are kept in a ring buffer. Every call is a
+    # no-op while the profiler is disabled.
+    def __init__(self, history=3600, enabled=False):
+        self.enabled = enabled
+        self.overlay = False
+        self.history = history
+        self.index = {stage: i for i, stage in enumerate(STAGES)}
+        self.times = np.zeros((history, len(STAGES)))  # Seconds per stage
+        self.starts = np.zeros(history)  # perf_counter() at the start of each frame
+        self.count = 0  # Frames recorded so far
+        self.current = np.zeros(len(STAGES))
+        self.frame_start = self.last = time.perf_counter()
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self.enabled = self.enabled or self.overlay
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last = time.perf_counter()
+        self.current[:] = 0
+
+    def lap(self, stage):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[self.index[stage]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        row = self.count % self.history
+        self.times[row] = self.current
+        self.starts[row] = self.frame_start
+        self.count += 1
+
+    def recent(self, frames=None):
+        # (starts, times) for up to `frames` of the latest frames, oldest first
+        kept = min(self.count, self.history)
+        frames = kept if frames is None else min(frames, kept)
+        rows = (np.arange(self.count - frames, self.count)) % self.history
+        return self.starts[rows], self.times[rows]
+
+    def dump(self, path):
+        # Chrome trace (chrome://tracing, Perfetto) for .json, otherwise CSV
+        starts, times = self.recent()
+        if path.endswith(".json"):
+            events = []
+            for start, row in zip(starts.tolist(), times.tolist()):
+                ts = start * 1e6
+                for stage, duration in zip(STAGES, row):
+                    if duration > 0:
+                        events.append({"name": stage, "ph": "X", "ts": ts, "dur": duration * 1e6, "pid": 1, "tid": 1})
+                        ts += duration * 1e6
+            with open(path, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        else:
+            with open(path, "w") as f:
+                f.write("frame,start_ms," + ",".join(f"{stage}_ms" for stage in STAGES) + ",total_ms\n")
+                first = self.count - len(starts)
+                for i, (start, row) in enumerate(zip(starts.tolist(), times.tolist())):
+                    cells = ",".join(f"{duration * 1000:.4f}" for duration in row)
+                    f.write(f"{first + i},{start * 1000:.3f},{cells},{sum(row) * 1000:.4f}\n")
+
+    def draw_overlay(self, screen, font, width=360):
+        # Frame time graph for the last `width` frames plus per-stage bars
+        # averaged over the last second. Returns the rect it covered.
+        line_height = font.get_linesize()
+        graph_height = 100
+        panel = pygame.Rect(screen.get_width() - width - 10, 10, width, graph_height + 20 + line_height * (len(STAGES) + 1))
+        screen.fill(BLACK, panel)
+        pygame.draw.rect(screen, WHITE, panel, 1)
+
+        _, times = self.recent(width)
+        if len(times):
+            totals = times.sum(axis=1) * 1000
+            scale = graph_height / (2 * BUDGET_MS)  # Full height = two frame budgets
+            budget_y = panel.top + 10 + graph_height - BUDGET_MS * scale
+            pygame.draw.line(screen, GREEN, (panel.left, budget_y), (panel.right - 1, budget_y))
+            points = [(panel.left + i, panel.top + 10 + graph_height - min(total * scale, graph_height))
+                      for i, total in enumerate(totals.tolist())]
+            if len(points) > 1:
+                pygame.draw.lines(screen, WHITE, False, points)
+
+            means = times[-60:].mean(axis=0) * 1000
+            y = panel.top + graph_height + 20
+            screen.blit(render_text(font, f"frame {totals[-60:].mean():6.2f} ms", WHITE), (panel.left + 6, y))
+            for stage, mean in zip(STAGES, means.tolist()):
+                y += line_height
+                screen.blit(render_text(font, stage, WHITE), (panel.left + 6, y))
+                bar = pygame.Rect(panel.left + 120, y + 2, min(mean * 40, width - 130), line_height - 4)
+                if bar.width >= 1:
+                    screen.fill(RED if mean > BUDGET_MS / 4 else GREEN, bar)
+        return panel
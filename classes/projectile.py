@@ -1,96 +1,243 @@
 # classes/projectile.py
 import pygame
 import logging  # Import logging module
-from config.config import ammo_colors, WIDTH, HEIGHT, CYAN
+import numpy as np
+from config.config import ammo_colors, velocity_multipliers, ammo_gravity, ammo_max_bounces, WIDTH, HEIGHT, CYAN, TICK, TICK_RATE
+from classes.batch import BatchField, BatchGroup, rect_array, sweep
+from classes.surface_cache import solid_surface
+from classes.pool import Pool, PooledSprite
+from classes.sky_snake import segment_pool
+
+AMMO_CODES = {"regular": 0, "bouncy": 1, "piercing": 2, "feathershot": 3}
+BOUNCY = AMMO_CODES["bouncy"]
+PIERCING = AMMO_CODES["piercing"]
+PLATFORM_TICKS = 60 * TICK_RATE  # A feathershot platform lasts a minute
+
+
+def launch_velocity(ammo_type, dx, dy, power):
+    # Initial (vx, vy) for a shot aimed along (dx, dy), or None if there is no direction
+    distance = (dx**2 + dy**2)**0.5
+    if distance == 0:
+        return None
+    v = power * 0.2 * velocity_multipliers.get(ammo_type, 1.0)
+    return v * (dx / distance), v * (dy / distance)
+
+
+class Projectile(PooledSprite):
+    # Hot state is stored in the ProjectileGroup's arrays while the projectile is in one
+    x = BatchField()
+    y = BatchField()
+    vx = BatchField()
+    vy = BatchField()
+    gravity = BatchField()
+    stopped = BatchField()
+    is_platform = BatchField()
+    bounces = BatchField()
+    max_bounces = BatchField()
+    timer = BatchField()
+    batch = None
+    slot = None
 
-class Projectile(pygame.sprite.Sprite):
     def __init__(self, x, y, vx, vy, ammo_type):
         super().__init__()
-        self.image = pygame.Surface((10, 10))
-        self.image.fill(ammo_colors[ammo_type])
-        self.rect = self.image.get_rect()
-        self.pos = [x, y]
+        self.rect = pygame.Rect(0, 0, 10, 10)
+        self.reuse(x, y, vx, vy, ammo_type)
+
+    def reuse(self, x, y, vx, vy, ammo_type):
+        # (Re)initialise; called by projectile_pool.acquire() on a released projectile
+        self.image = solid_surface((10, 10), ammo_colors[ammo_type])
+        self.rect.size = (10, 10)
+        self.x = x
+        self.y = y
         self.rect.center = (int(x), int(y))
         self.vx = vx
         self.vy = vy
-        self.gravity = 0.3 if ammo_type == "feathershot" else 0.5  # Reduced gravity for feathershot
+        self.gravity = ammo_gravity[ammo_type]  # Reduced gravity for feathershot
         self.stopped = False
         self.ammo_type = ammo_type
         self.is_platform = False
-        self.prev_vy = vy
         self.bounces = 0
-        self.max_bounces = 3 if ammo_type == "bouncy" else 0
+        self.max_bounces = ammo_max_bounces[ammo_type]
         self.timer = 0
         self.defeated_snake = False  # Flag to indicate if snake is defeated
 
-    def update(self, platforms, snake_segments, acid_group, projectiles):
-        if not self.stopped:
-            logging.debug(f"Updating projectile: pos={self.pos}, stopped={self.stopped}")
-            self.pos[0] += self.vx
-            self.pos[1] += self.vy
-            self.vy += self.gravity
-            self.rect.center = (int(self.pos[0]), int(self.pos[1]))
-
-            # Check collision with snake segments
-            for segment in snake_segments:
-                if self.rect.colliderect(segment.rect) and not self.stopped:
-                    if len(snake_segments) > 1:
-                        snake_segments.pop()  # Remove last body segment
-                        logging.info(f"Removed segment, new length: {len(snake_segments)}")
-                        if self.ammo_type != "piercing":
-                            self.kill()
-                    else:
-                        logging.info("Defeating snake")
-                        self.defeated_snake = True
-                        self.kill()
-
-            # Handle bouncy ammo
-            if self.ammo_type == "bouncy":
-                for platform in platforms:
-                    if self.rect.colliderect(platform.rect):
-                        if self.vy > 0 and self.rect.bottom - self.vy <= platform.rect.top:
-                            self.rect.bottom = platform.rect.top
-                            self.vy = -self.vy * 0.8
-                            self.bounces += 1
-                            if self.bounces >= self.max_bounces:
-                                self.stopped = True
-                                self.vy = 0
-                                self.vx = 0
-                for proj in projectiles:
-                    if proj.is_platform and self.rect.colliderect(proj.rect):
-                        if self.vy > 0 and self.rect.bottom - self.vy <= proj.rect.top:
-                            self.rect.bottom = proj.rect.top
-                            self.vy = -self.vy * 0.8
-                            self.bounces += 1
-                            if self.bounces >= self.max_bounces:
-                                self.stopped = True
-                                self.vy = 0
-                                self.vx = 0
-            # Handle piercing ammo
-            elif self.ammo_type == "piercing":
-                for platform in platforms:
-                    if self.rect.colliderect(platform.rect):
-                        if self.vy > 0 and self.rect.bottom - self.vy <= platform.rect.top:
-                            self.stopped = True
-                            self.vy = 0
-                            self.vx = 0
-            # Handle regular and feathershot ammo
-            else:
-                for platform in platforms:
-                    if self.rect.colliderect(platform.rect):
-                        if self.vy > 0 and self.rect.bottom - self.vy <= platform.rect.top:
-                            self.stopped = True
-                            self.vy = 0
-                            self.vx = 0
-
-            self.prev_vy = self.vy
-
-            # Remove projectile if it goes off-screen
-            if self.rect.left > WIDTH or self.rect.right < 0 or self.rect.top > HEIGHT:
-                self.kill()
-
-        # Handle platform timer
-        if self.is_platform:
-            self.timer += 1
-            if self.timer >= 3600:
-                self.kill()
\ No newline at end of file
+    @property
+    def pos(self):
+        return [self.x, self.y]
+
+    def make_platform(self):
+        # Freeze a feathershot in place as a 30x30 platform
+        self.is_platform = True
+        self.stopped = True  # Stop movement
+        self.image = solid_surface((30, 30), CYAN)
+        self.rect = self.image.get_rect(center=self.rect.center)
+        self.timer = 0
+        if self.batch is not None:
+            self.batch.sync_rect(self)
+
+
+projectile_pool = Pool(Projectile)
+
+
+class ProjectileGroup(BatchGroup):
+    # Integrates, collides and culls every live projectile in a few array
+    # operations per frame, with the same rules per ammo type as before
+    fields = {
+        "x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64, "gravity": np.float64,
+        "stopped": np.bool_, "is_platform": np.bool_,
+        "bounces": np.int64, "max_bounces": np.int64, "timer": np.int64,
+    }
+    extra = {"ammo": np.int8}
+
+    def __init__(self, *sprites):
+        self.defeated_snake = False  # Set when a projectile hits a snake's last segment
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.ammo[sprite.slot] = AMMO_CODES[sprite.ammo_type]
+
+    def resting(self):
+        # Stopped projectiles and feathershot platforms, in group order
+        n = self.compact()
+        rows = np.flatnonzero(self.stopped[:n] | self.is_platform[:n])
+        return [self.members[i] for i in rows.tolist()]
+
+    def platform_sprites(self):
+        n = self.compact()
+        return [self.members[i] for i in np.flatnonzero(self.is_platform[:n]).tolist()]
+
+    def update(self, platforms, snakes, grid=None):
+        n = self.compact()
+        if not n:
+            return
+        rows = np.flatnonzero(~self.stopped[:n])
+        if rows.size:
+            logging.debug("Updating %d projectiles", rows.size)
+            # Collisions are swept from last frame's rect to this frame's, so
+            # fast shots can't skip over the ground or a snake segment
+            left0 = self.left[rows]
+            top0 = self.top[rows]
+            self.x[rows] += self.vx[rows] * TICK
+            self.y[rows] += self.vy[rows] * TICK
+            self.vy[rows] += self.gravity[rows] * TICK
+            self.left[rows] = np.trunc(self.x[rows]).astype(np.int64) - self.width[rows] // 2
+            self.top[rows] = np.trunc(self.y[rows]).astype(np.int64) - self.height[rows] // 2
+
+            impact, surface = self._platform_contacts(rows, left0, top0, platforms, grid, n)
+            self._hit_snakes(rows, left0, top0, snakes, grid, impact)
+            self._hit_platforms(rows, impact, surface)
+
+            # Remove projectiles that go off-screen
+            left = self.left[rows]
+            gone = (left > WIDTH) | (left + self.width[rows] < 0) | (self.top[rows] > HEIGHT)
+            self._kill_rows(rows[gone])
+            self.write_rects(rows)
+
+        # Feathershot platforms expire after PLATFORM_TICKS
+        timed = np.flatnonzero(self.is_platform[:n])
+        self.timer[timed] += 1
+        self._kill_rows(timed[self.timer[timed] >= PLATFORM_TICKS])
+
+    def _hit_snakes(self, rows, left0, top0, snakes, grid, impact):
+        # Candidate segments of every snake, each with its (snake, index in
+        # snake.segments). With a grid they come from its shared segment
+        # index, so a wave of snakes costs no more than the segments near a shot.
+        if grid:
+            items = grid.segments.query_items(self.swept_bounds(rows, left0, top0))
+            owners = [grid.segment_owners[index] for index, _ in items]
+            segments = [segment for _, segment in items]
+        else:
+            owners = [(snake, j) for snake in snakes for j in range(len(snake.segments))]
+            segments = [segment for snake in snakes for segment in snake.segments]
+        if not segments:
+            return
+        # Only segments reached before the shot lands or bounces count
+        times = sweep(left0, top0, self.left[rows], self.top[rows], self.width[rows], self.height[rows],
+                      rect_array(segments))
+        hits = times < impact[:, None]
+        # Hits are resolved one projectile at a time, in group order, because
+        # every hit pops its snake's tail and shortens it for later projectiles
+        for k in np.flatnonzero(hits.any(axis=1)).tolist():
+            i = rows[k]
+            sprite = self.members[i]
+            for c in np.flatnonzero(hits[k]).tolist():
+                snake, j = owners[c]
+                snake_segments = snake.segments
+                if j >= len(snake_segments):
+                    continue  # Already shot off this frame
+                if len(snake_segments) > 1:
+                    segment_pool.release(snake_segments.pop())  # Remove last body segment
+                    logging.info("Removed segment, new length: %d", len(snake_segments))
+                    if self.ammo[i] != PIERCING:
+                        sprite.kill()
+                else:
+                    logging.info("Defeating snake")
+                    sprite.defeated_snake = True
+                    snake.defeated = True
+                    self.defeated_snake = True
+                    sprite.kill()
+
+    def _platform_contacts(self, rows, left0, top0, platforms, grid, n):
+        # Time of impact within the frame and the top edge of the first
+        # platform each row falls onto (inf and 0 where there is none).
+        # Bouncy ammo also bounces off feathershot platforms; a platform that
+        # expires this frame is only seen by projectiles updated before it.
+        if grid:
+            platforms = grid.platforms.query(self.swept_bounds(rows, left0, top0))
+        boxes = rect_array(list(platforms))
+        visible = np.ones((rows.size, len(boxes)), dtype=bool)
+        bouncy = self.ammo[rows] == BOUNCY
+        if bouncy.any():
+            feathershot = np.flatnonzero(self.is_platform[:n])
+            if feathershot.size:
+                boxes = np.concatenate((boxes, np.stack((
+                    self.left[feathershot], self.top[feathershot],
+                    self.left[feathershot] + self.width[feathershot],
+                    self.top[feathershot] + self.height[feathershot]), axis=1)))
+                seen = bouncy[:, None] & ((self.timer[feathershot] + 1 < PLATFORM_TICKS) | (rows[:, None] < feathershot))
+                visible = np.concatenate((visible, seen), axis=1)
+
+        impact = np.full(rows.size, np.inf)
+        surface = np.zeros(rows.size, dtype=np.int64)
+        if not len(boxes):
+            return impact, surface
+        height = self.height[rows]
+        times = sweep(left0, top0, self.left[rows], self.top[rows], self.width[rows], height, boxes)
+        # Only landing on top counts: falling, and not already below the top edge
+        falling = visible & (self.vy[rows] > 0)[:, None] & ((top0 + height)[:, None] <= boxes[:, 1])
+        times = np.where(falling, times, np.inf)
+        first = times.argmin(axis=1)
+        impact = times[np.arange(rows.size), first]
+        surface = boxes[first, 1]
+        return impact, surface
+
+    def _hit_platforms(self, rows, impact, surface):
+        hit = np.isfinite(impact)
+        if not hit.any():
+            return
+        rows = rows[hit]
+        impact = impact[hit]
+        # Move back to the point of contact, resting on the platform
+        height = self.height[rows]
+        self.x[rows] -= self.vx[rows] * TICK * (1 - impact)
+        self.y[rows] = surface[hit] - height + height // 2
+        self.left[rows] = np.trunc(self.x[rows]).astype(np.int64) - self.width[rows] // 2
+        self.top[rows] = surface[hit] - height
+
+        bouncy = rows[self.ammo[rows] == BOUNCY]
+        self.vy[bouncy] = -self.vy[bouncy] * 0.8
+        self.bounces[bouncy] += 1
+        self._stop(bouncy[self.bounces[bouncy] >= self.max_bounces[bouncy]])
+        self._stop(rows[self.ammo[rows] != BOUNCY])
+
+    def _stop(self, rows):
+        self.stopped[rows] = True
+        self.vy[rows] = 0
+        self.vx[rows] = 0
+
+    def _kill_rows(self, rows):
+        for i in rows.tolist():
+            sprite = self.members[i]
+            if sprite is not None:
+                sprite.kill()
@@ -0,0 +1,144 @@
+# classes/recording.py
+# Deterministic input recording and headless replay
+import gzip
+import os
+import random
+import struct
+import pygame
+from config.config import LEVEL, REWIND_SECONDS
+from classes.world import World, FrameInput, HELD_KEYS
+
+MAGIC = b"SKYREC"
+VERSION = 1
+HEADER = struct.Struct("<6sBq")  # Magic, version, RNG seed
+
+# Op bytes. A step is 0x00-0x07 (bit i set = HELD_KEYS[i] held), plus 0x08 if events follow.
+HAS_EVENTS = 0x08
+RESET = 0x10
+END = 0x20
+REWIND = 0x30  # Followed by the frame play resumed from
+RESUME = 0x40  # Unpaused from the pause menu
+
+# Only the events World.handle_event reacts to are recorded
+MOUSE = struct.Struct("<BBhh")  # Kind, button, x, y
+KEY = struct.Struct("<BiH")  # Kind, key, mod
+KINDS = {pygame.MOUSEBUTTONDOWN: 1, pygame.MOUSEBUTTONUP: 2, pygame.KEYDOWN: 3}
+EVENT_TYPES = {kind: event_type for event_type, kind in KINDS.items()}
+TRAILER = struct.Struct("<I20s")  # Frames stepped, World.state_digest()
+FRAME = struct.Struct("<I")
+
+
+class InputRecorder:
+    # Seeds the global RNG, then captures every World.step/reset to a compact
+    # gzip'd stream. Create it before the World it records.
+    def __init__(self, path, seed=None):
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(4), "little")
+        random.seed(self.seed)
+        self.file = gzip.open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.seed))
+        self.frames = 0
+
+    def record_step(self, inputs):
+        op = 0
+        for bit, key in enumerate(HELD_KEYS):
+            if inputs[key]:
+                op |= 1 << bit
+        events = [event for event in inputs.events if event.type in KINDS]
+        if not events:
+            self.file.write(bytes((op,)))
+        else:
+            chunks = [bytes((op | HAS_EVENTS, len(events)))]
+            for event in events:
+                kind = KINDS[event.type]
+                if event.type == pygame.KEYDOWN:
+                    chunks.append(KEY.pack(kind, event.key, event.mod))
+                else:
+                    chunks.append(MOUSE.pack(kind, event.button, *event.pos))
+            self.file.write(b"".join(chunks))
+        self.frames += 1
+
+    def record_reset(self):
+        self.file.write(bytes((RESET,)))
+
+    def record_rewind(self, frame):
+        self.file.write(bytes((REWIND,)) + FRAME.pack(frame))
+
+    def record_resume(self):
+        self.file.write(bytes((RESUME,)))
+
+    def close(self, world):
+        if self.file is None:
+            return
+        self.file.write(bytes((END,)) + TRAILER.pack(self.frames, bytes.fromhex(world.state_digest())))
+        self.file.close()
+        self.file = None
+
+
+def read_recording(path):
+    # Yields ("seed", n), ("step", FrameInput), ("reset", None), ("rewind", frame),
+    # ("resume", None) and ("end", (frames, digest))
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} SkySnake recording")
+    yield "seed", seed
+    offset = HEADER.size
+    while offset < len(data):
+        op = data[offset]
+        offset += 1
+        if op == RESET:
+            yield "reset", None
+        elif op == REWIND:
+            yield "rewind", FRAME.unpack_from(data, offset)[0]
+            offset += FRAME.size
+        elif op == RESUME:
+            yield "resume", None
+        elif op == END:
+            frames, digest = TRAILER.unpack_from(data, offset)
+            offset += TRAILER.size
+            yield "end", (frames, digest.hex())
+        else:
+            events = []
+            if op & HAS_EVENTS:
+                count = data[offset]
+                offset += 1
+                for _ in range(count):
+                    kind = data[offset]
+                    if EVENT_TYPES[kind] == pygame.KEYDOWN:
+                        _, key, mod = KEY.unpack_from(data, offset)
+                        events.append(pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod))
+                        offset += KEY.size
+                    else:
+                        _, button, x, y = MOUSE.unpack_from(data, offset)
+                        events.append(pygame.event.Event(EVENT_TYPES[kind], button=button, pos=(x, y)))
+                        offset += MOUSE.size
+            held = [key for bit, key in enumerate(HELD_KEYS) if op & (1 << bit)]
+            yield "step", FrameInput(events, held)
+
+
+def replay(path, level=LEVEL, wave=0):
+    # Re-run a recording headless as fast as possible. Returns the World and
+    # whether its final state matches the one stored at record time (None if
+    # the recording was cut off before it was closed). Recordings don't store
+    # the level or wave size, so they must be the ones the session was played on.
+    world = None
+    matches = None
+    ops = list(read_recording(path))
+    # Rewinding needs the same history the session had, so keep one only if it rewound
+    rewind_seconds = REWIND_SECONDS if any(op == "rewind" for op, _ in ops) else 0
+    for op, value in ops:
+        if op == "seed":
+            random.seed(value)
+            world = World(level=level, rewind_seconds=rewind_seconds, wave=wave)
+        elif op == "step":
+            world.step(value)
+        elif op == "reset":
+            world.reset()
+        elif op == "rewind":
+            world.rewind_to(value)
+        elif op == "resume":
+            world.resume()
+        elif op == "end":
+            matches = value[1] == world.state_digest()
+    return world, matches
@@ -0,0 +1,96 @@
+# classes/renderer.py
+import pygame
+from config.config import BLACK, WHITE, TICK
+from classes.surface_cache import render_text
+from classes.profiler import FrameProfiler
+from classes.governor import FrameGovernor
+from classes.interpolation import interpolate
+from classes.aim import draw_aim
+
+
+class Renderer:
+    # Draws the running game. With `dirty` set, only the regions covered by
+    # something this frame or last frame are cleared and sent to the display;
+    # if those regions add up to more than `max_dirty_fraction` of the screen
+    # it falls back to a full clear and flip. A FrameGovernor, if given,
+    # decides how much optional detail is drawn.
+    def __init__(self, screen, font, dirty=False, max_dirty_fraction=0.35, profiler=None, governor=None):
+        self.screen = screen
+        self.font = font
+        self.profiler = profiler or FrameProfiler()
+        self.governor = governor or FrameGovernor(enabled=False)
+        self.dirty = dirty
+        self.max_dirty_area = max_dirty_fraction * screen.get_width() * screen.get_height()
+        self.previous = None  # Rects drawn last frame; None forces a full redraw
+
+    def invalidate(self):
+        # Call when something else has drawn over the screen (menus, end screens)
+        self.previous = None
+
+    def draw(self, world, mouse_pos, banner=None, previous=None, alpha=1.0):
+        # `previous` (from capture_positions before the latest tick) and
+        # `alpha` (0-1, how far into the next tick) blend moving sprites
+        # between ticks when rendering faster than the simulation
+        screen = self.screen
+        profiler = self.profiler
+        full = not self.dirty or self.previous is None or area(self.previous) > self.max_dirty_area
+        if full:
+            screen.fill(BLACK)
+        else:
+            for rect in self.previous:
+                screen.fill(BLACK, rect)
+
+        detail = self.governor.detail
+        drawn = []
+        blend = previous is not None and alpha < 1
+        view = screen.get_rect()
+        groups = ((world.platforms, False), (world.food_group, False), (world.segments(), True),
+                  (world.player_group, True), (world.projectiles, True), (world.acid_group, True))
+        for group, moves in groups:
+            if moves and blend:
+                blits = [(sprite.image, interpolate(sprite.rect, previous.get(sprite), alpha)) for sprite in group]
+            else:
+                blits = [(sprite.image, sprite.rect) for sprite in group]
+            if detail["cull"]:
+                # Skip sprites entirely off the screen rather than letting blit clip them
+                blits = [blit for blit in blits if view.colliderect(blit[1])]
+            drawn += screen.blits(blits)
+        profiler.lap("scene")
+
+        if world.charging:
+            # Levels give the preview's length and dot spacing in 60ths of a second
+            steps = round(detail["aim_steps"] / TICK)
+            every = max(1, round(detail["aim_every"] / TICK))
+            drawn += draw_aim(screen, world, mouse_pos, steps, every)
+        profiler.lap("trajectory")
+
+        # Draw UI
+        player = world.player
+        hud = [(render_text(self.font, f"Ammo: {player.current_ammo}", WHITE), (10, 10)),
+               (render_text(self.font, f"Health: {int(player.health)}%", WHITE), (10, 50))]
+        if world.wave:
+            hud.append((render_text(self.font, f"Snakes: {len(world.snakes)}", WHITE), (10, 90)))
+        if banner:
+            text = render_text(self.font, banner, WHITE)
+            hud.append((text, text.get_rect(midtop=(screen.get_width() // 2, 10))))
+        drawn += screen.blits(hud)
+        profiler.lap("hud")
+
+        if profiler.overlay:
+            drawn.append(profiler.draw_overlay(screen, self.font))
+            profiler.lap("overlay")
+
+        if full:
+            pygame.display.flip()
+        else:
+            dirty = self.previous + drawn
+            if area(dirty) > self.max_dirty_area:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+        profiler.lap("flip")
+        self.previous = drawn
+
+
+def area(rects):
+    return sum(rect.width * rect.height for rect in rects)
@@ -0,0 +1,200 @@
+# classes/rewind.py
+# Rewind: the last few seconds of World state, kept as compact records in one
+# preallocated byte arena used as a ring. New records overwrite the oldest,
+# so memory use is fixed however long the session runs.
+import marshal
+import random
+from collections import deque
+import numpy as np
+from config.config import CYAN
+from classes.food import food_pool
+from classes.sky_snake import SkySnake, segment_pool
+from classes.projectile import projectile_pool, AMMO_CODES
+from classes.acid_droplet import droplet_pool
+from classes.pool import release_all
+from classes.surface_cache import solid_surface
+
+AMMO_TYPES = tuple(AMMO_CODES)
+PROJECTILE_COLUMNS = ("x", "y", "vx", "vy", "gravity", "stopped", "is_platform", "bounces", "max_bounces", "timer",
+                      "ammo", "left", "top")
+ACID_COLUMNS = ("x", "y", "vy", "gravity", "left", "top")
+RNG_WORDS = 625  # Mersenne Twister state words plus its position
+
+
+class RewindBuffer:
+    # Holds at most `frames` records in `memory` bytes, oldest first. A record
+    # is a marshalled header of Python scalars (so ints stay ints and floats
+    # stay floats) followed by float64 entity rows and the uint32 RNG state.
+    def __init__(self, frames, memory):
+        self.frames = frames
+        self.arena = np.zeros(memory, dtype=np.uint8)
+        self.records = deque()  # (frame, offset, header bytes, float count), oldest first
+        self.head = 0  # Where the next record is written
+
+    def __len__(self):
+        return len(self.records)
+
+    def frame(self, index):
+        return self.records[index][0]
+
+    def index(self, frame):
+        # Index of the record for `frame`; frames are recorded in order
+        for i, record in enumerate(self.records):
+            if record[0] == frame:
+                return i
+        raise ValueError(f"frame {frame} is not in the rewind buffer")
+
+    def clear(self):
+        self.records.clear()
+        self.head = 0
+
+    def capture(self, world):
+        player = world.player
+        # Only the path the segments can still be placed along next tick; the
+        # rest of each window is history the snake no longer needs
+        windows = [snake.path.recent((len(snake.segments) + 1) * snake.spacing) for snake in world.snakes]
+        projectiles = world.projectiles
+        n = projectiles.compact()
+        acid = world.acid_group
+        a = acid.compact()
+        version, internal, gauss = random.getstate()
+        header = marshal.dumps((
+            world.frame, world.charging, world.power,
+            player.rect.topleft, player.vy, tuple(player.carry), player.on_ground, player.health, player.last_y,
+            player.current_ammo, tuple(player.ammo_counts.values()),
+            tuple((tuple(snake.head_pos), tuple(snake.velocity), snake.drop_timer, snake.path.capacity,
+                   window.shape[1], len(snake.segments)) for snake, window in zip(world.snakes, windows)),
+            n, a, len(world.food_group), version, gauss,
+        ))
+        floats = np.concatenate((
+            *(window.ravel() for window in windows),
+            np.array([segment.rect.topleft for segment in world.segments()], dtype=np.float64).ravel(),
+            np.concatenate([getattr(projectiles, name)[:n] for name in PROJECTILE_COLUMNS]).astype(np.float64),
+            np.concatenate([getattr(acid, name)[:a] for name in ACID_COLUMNS]).astype(np.float64),
+            np.array([food.rect.center for food in world.food_group], dtype=np.float64).ravel(),
+        ))
+        header_size = -(-len(header) // 8) * 8  # Keeps the float rows 8-byte aligned
+        size = header_size + floats.nbytes + RNG_WORDS * 4
+        if size > len(self.arena):
+            return False
+        offset = self._reserve(size)
+        arena = self.arena
+        arena[offset:offset + len(header)] = np.frombuffer(header, dtype=np.uint8)
+        start = offset + header_size
+        arena[start:start + floats.nbytes] = floats.view(np.uint8)
+        start += floats.nbytes
+        arena[start:start + RNG_WORDS * 4] = np.array(internal, dtype=np.uint32).view(np.uint8)
+        self.records.append((world.frame, offset, header_size, len(floats)))
+        self.head = offset + size
+        return True
+
+    def _reserve(self, size):
+        # Free `size` bytes at the write head, dropping the oldest records.
+        # Records always lie in ring order from the oldest round to the head.
+        records = self.records
+        while len(records) >= self.frames:
+            records.popleft()
+        if self.head + size > len(self.arena):
+            # Wrap: everything past the head is older than anything before it
+            while records and records[0][1] >= self.head:
+                records.popleft()
+            self.head = 0
+        end = self.head + size
+        while records and self.head <= records[0][1] < end:
+            records.popleft()
+        return self.head
+
+    def truncate(self, index):
+        # Forget every record after `index`, e.g. once play resumes from it
+        records = self.records
+        while len(records) > index + 1:
+            records.pop()
+        if records:
+            _, offset, header_size, count = records[-1]
+            self.head = offset + header_size + count * 8 + RNG_WORDS * 4
+        else:
+            self.head = 0
+
+    def restore(self, world, index):
+        # Put `world` back exactly as it was when record `index` was captured
+        _, offset, header_size, count = self.records[index]
+        arena = self.arena
+        (frame, charging, power, player_pos, vy, carry, on_ground, health, last_y, current_ammo, ammo_counts,
+         snakes, n, a, f, version, gauss) = marshal.loads(arena[offset:offset + header_size].tobytes())
+        start = offset + header_size
+        floats = arena[start:start + count * 8].view(np.float64)
+        start += count * 8
+        internal = arena[start:start + RNG_WORDS * 4].view(np.uint32)
+        random.setstate((version, tuple(internal.tolist()), gauss))
+
+        world.frame = frame
+        world.charging = charging
+        world.power = power
+        world.projectiles.defeated_snake = False
+
+        player = world.player
+        player.rect.topleft = player_pos
+        player.vy = vy
+        player.carry = list(carry)
+        player.on_ground = on_ground
+        player.health = health
+        player.last_y = last_y
+        player.current_ammo = current_ammo
+        player.ammo_counts = dict(zip(player.ammo_counts, ammo_counts))
+
+        # Snakes defeated since the record are rebuilt; any snake object will
+        # do, since every bit of its state is restored
+        while len(world.snakes) > len(snakes):
+            world.snakes.pop().release()
+        while len(world.snakes) < len(snakes):
+            world.snakes.append(SkySnake())
+        world.snake = world.snakes[0]
+        i = 0
+        for snake, (head_pos, velocity, drop_timer, path_capacity, path_samples, _) in zip(world.snakes, snakes):
+            snake.head_pos = list(head_pos)
+            snake.velocity = list(velocity)
+            snake.drop_timer = drop_timer
+            snake.defeated = False
+            snake.path.load(floats[i:i + path_samples * 3].reshape(3, path_samples), path_capacity)
+            i += path_samples * 3
+        for snake, record in zip(world.snakes, snakes):
+            segment_count = record[-1]
+            segments = snake.segments
+            while len(segments) > segment_count:
+                segment_pool.release(segments.pop())
+            while len(segments) < segment_count:
+                segments.append(snake.make_segment((0, 0)))
+            for segment, topleft in zip(segments, floats[i:i + segment_count * 2].reshape(-1, 2).astype(np.int64).tolist()):
+                segment.rect.topleft = topleft
+            i += segment_count * 2
+
+        release_all(world.projectiles)
+        rows = floats[i:i + n * len(PROJECTILE_COLUMNS)].reshape(len(PROJECTILE_COLUMNS), n).T.tolist()
+        for x, y, vx, vy, gravity, stopped, is_platform, bounces, max_bounces, timer, ammo, left, top in rows:
+            proj = projectile_pool.acquire(x, y, vx, vy, AMMO_TYPES[int(ammo)])
+            proj.gravity = gravity
+            proj.stopped = bool(stopped)
+            proj.bounces = int(bounces)
+            proj.max_bounces = int(max_bounces)
+            proj.timer = int(timer)
+            if is_platform:
+                proj.is_platform = True
+                proj.image = solid_surface((30, 30), CYAN)
+                proj.rect.size = (30, 30)
+            proj.rect.topleft = (int(left), int(top))
+            world.projectiles.add(proj)
+        i += n * len(PROJECTILE_COLUMNS)
+
+        release_all(world.acid_group)
+        rows = floats[i:i + a * len(ACID_COLUMNS)].reshape(len(ACID_COLUMNS), a).T.tolist()
+        for x, y, vy, gravity, left, top in rows:
+            droplet = droplet_pool.acquire(x, y)
+            droplet.vy = vy
+            droplet.gravity = gravity
+            droplet.rect.topleft = (int(left), int(top))
+            world.acid_group.add(droplet)
+        i += a * len(ACID_COLUMNS)
+
+        release_all(world.food_group)
+        for center in floats[i:i + f * 2].reshape(-1, 2).astype(np.int64).tolist():
+            world.food_group.add(food_pool.acquire(tuple(center)))
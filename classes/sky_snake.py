@@ -1,80 +1,131 @@
 # classes/sky_snake.py
-import pygame
 import random
 import math
-from config.config import RED, WIDTH, HEIGHT
-from classes.food import Food
-from classes.acid_droplet import AcidDroplet
+import numpy as np
+from config.config import RED, WIDTH, HEIGHT, TICK, balance
+from classes.acid_droplet import droplet_pool
+from classes.snake_path import SnakePath
+from classes.surface_cache import solid_surface
+from classes.pool import Pool, PooledSprite
+
+
+class Segment(PooledSprite):
+    def __init__(self, center):
+        super().__init__()
+        self.image = solid_surface((20, 20), RED)
+        self.rect = self.image.get_rect()
+        self.reuse(center)
+
+    def reuse(self, center):
+        # Called by segment_pool.acquire() on a segment shot off an earlier snake
+        self.rect.center = center
+
+
+segment_pool = Pool(Segment)
+
 
 class SkySnake:
-    def __init__(self):
-        self.head_pos = [WIDTH / 2, HEIGHT / 2]
-        self.velocity = [5, 0]
-        self.spacing_frames = 4
-        self.max_positions = 200
-        self.positions = [self.head_pos.copy() for _ in range(self.max_positions)]
-        self.segments = []
-        for i in range(6):
-            segment = pygame.sprite.Sprite()
-            segment.image = pygame.Surface((20, 20))
-            segment.image.fill(RED)
-            segment.rect = segment.image.get_rect(center=self.head_pos)
-            self.segments.append(segment)
-        self.drop_timer = 0
-
-    def update(self, food_group, acid_group, feathershot_platforms):
-        self.head_pos[0] += self.velocity[0]
-        self.head_pos[1] += self.velocity[1]
+    def __init__(self, head=(WIDTH / 2, HEIGHT / 2), velocity=(5, 0), length=6, drop_timer=0):
+        self.head_pos = list(head)
+        self.velocity = list(velocity)
+        self.spacing = 20  # Distance between segment centres along the head's path
+        self.path = SnakePath(*self.head_pos)
+        self.segments = [self.make_segment(self.head_pos) for _ in range(length)]
+        self.drop_timer = drop_timer
+        self.defeated = False  # Set by ProjectileGroup when its last segment is hit
+        self.seek_food = balance["snake_seek_food"]
+        self.turn_rate = balance["snake_turn_rate"]
+
+    def update(self, food_group, acid_group, feathershot_platforms, grid=None):
+        self.head_pos[0] += self.velocity[0] * TICK
+        self.head_pos[1] += self.velocity[1] * TICK
 
         if self.head_pos[0] < 0 or self.head_pos[0] > WIDTH:
             self.velocity[0] = -self.velocity[0]
         if self.head_pos[1] < 0 or self.head_pos[1] > HEIGHT:
             self.velocity[1] = -self.velocity[1]
 
-        self.positions.append(self.head_pos.copy())
-        if len(self.positions) > self.max_positions:
-            self.positions.pop(0)
-
-        for i, segment in enumerate(self.segments):
-            index = - (i + 1) * self.spacing_frames - 1
-            if -index < len(self.positions):
-                segment.rect.center = self.positions[index]
+        # Segment i sits (i + 1) * spacing pixels behind the head, however long the snake is
+        count = len(self.segments)
+        self.path.append(self.head_pos[0], self.head_pos[1], (count + 1) * self.spacing)
+        xs, ys = self.path.sample(self.spacing * np.arange(1, count + 1))
+        for segment, x, y in zip(self.segments, xs.tolist(), ys.tolist()):
+            segment.rect.center = (x, y)
 
         head_rect = self.segments[0].rect
-        for food in food_group:
+        for food in (grid.food.query(head_rect) if grid else food_group):
             if head_rect.colliderect(food.rect):
                 food.kill()
-                new_food = Food()
-                food_group.add(new_food)
-                new_segment = pygame.sprite.Sprite()
-                new_segment.image = pygame.Surface((20, 20))
-                new_segment.image.fill(RED)
-                new_segment.rect = new_segment.image.get_rect(center=self.segments[-1].rect.center)
-                self.segments.append(new_segment)
-
-        for proj in feathershot_platforms:
+                food_group.spawn()
+                self.grow()
+
+        for proj in (grid.resting.query(head_rect) if grid else feathershot_platforms):
             if proj.is_platform and head_rect.colliderect(proj.rect):
                 proj.kill()
-                new_segment = pygame.sprite.Sprite()
-                new_segment.image = pygame.Surface((20, 20))
-                new_segment.image.fill(RED)
-                new_segment.rect = new_segment.image.get_rect(center=self.segments[-1].rect.center)
-                self.segments.append(new_segment)
+                self.grow()
 
         self.drop_timer += 1
-        if self.drop_timer >= 180:
+        if self.drop_timer >= balance["acid_drop_interval"] / TICK:
             self.drop_timer = 0
             drop_segment = random.choice(self.segments)
-            acid = AcidDroplet(drop_segment.rect.centerx, drop_segment.rect.bottom)
+            acid = droplet_pool.acquire(drop_segment.rect.centerx, drop_segment.rect.bottom)
             acid_group.add(acid)
 
-        if random.random() < 0.0167:
+        if self.seek_food:
+            self.steer(food_group, feathershot_platforms)
+        elif random.random() < balance["snake_turn_chance"] * TICK:
             angle = random.uniform(-45, 45)
             self.velocity = self.rotate_vector(self.velocity, angle)
 
+    def steer(self, food_group, feathershot_platforms):
+        # Turn towards the nearest food or feathershot platform, at most
+        # turn_rate degrees per 60th of a second, keeping the same speed
+        x, y = self.head_pos
+        target = food_group.nearest(x, y)
+        best = None if target is None else (target.rect.centerx - x) ** 2 + (target.rect.centery - y) ** 2
+        for proj in feathershot_platforms.platform_sprites():
+            distance = (proj.rect.centerx - x) ** 2 + (proj.rect.centery - y) ** 2
+            if best is None or distance < best:
+                target, best = proj, distance
+        if target is None:
+            return
+        wanted = math.degrees(math.atan2(target.rect.centery - y, target.rect.centerx - x))
+        heading = math.degrees(math.atan2(self.velocity[1], self.velocity[0]))
+        turn = (wanted - heading + 180) % 360 - 180
+        limit = self.turn_rate * TICK
+        self.velocity = self.rotate_vector(self.velocity, max(-limit, min(limit, turn)))
+
+    def make_segment(self, center):
+        return segment_pool.acquire(center)
+
+    def release(self):
+        # Hand every segment back to the pool when this snake is discarded
+        for segment in self.segments:
+            segment_pool.release(segment)
+        self.segments = []
+
+    def grow(self):
+        # New segments start on the tail and fan out along the path next frame
+        self.segments.append(self.make_segment(self.segments[-1].rect.center))
+
     def rotate_vector(self, vec, angle_deg):
         angle_rad = math.radians(angle_deg)
         x, y = vec
         new_x = x * math.cos(angle_rad) - y * math.sin(angle_rad)
         new_y = x * math.sin(angle_rad) + y * math.cos(angle_rad)
-        return [new_x, new_y]
\ No newline at end of file
+        return [new_x, new_y]
+
+
+def spawn_wave(center, count, length, radius=200):
+    # `count` snakes on a ring around `center`, each heading straight out from
+    # it. Acid timers are staggered so the wave doesn't drop all at once.
+    # Uses no randomness, so a wave starts the same way for any seed.
+    snakes = []
+    interval = balance["acid_drop_interval"]
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        dx, dy = math.cos(angle), math.sin(angle)
+        head = (center[0] + radius * dx, center[1] + radius * dy)
+        snakes.append(SkySnake(head, (5 * dx, 5 * dy), length, int(i * interval / TICK) // count))
+    return snakes
+
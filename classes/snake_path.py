@@ -0,0 +1,77 @@
+# classes/snake_path.py
+import math
+import numpy as np
+
+
+class SnakePath:
+    # Preallocated ring buffer of head positions indexed by the distance the
+    # head has travelled. Each sample is written twice (at i and i + capacity)
+    # so the live window is always one contiguous slice, ready for np.interp.
+    def __init__(self, x, y, capacity=256):
+        self.capacity = capacity
+        self.data = np.zeros((3, 2 * capacity))  # Rows: travelled distance, x, y
+        self.start = 0  # Index of the oldest sample
+        self.count = 0
+        self.distance = 0.0
+        self.last = (x, y)
+        self.append(x, y, 0)
+
+    def append(self, x, y, keep):
+        # Record a new head position, keeping at least `keep` pixels of history
+        lx, ly = self.last
+        self.distance += math.hypot(x - lx, y - ly)
+        self.last = (x, y)
+
+        cap = self.capacity
+        if self.count == cap:
+            # Drop the oldest sample only if the next one still covers `keep`
+            if self.data[0, self.start + 1] <= self.distance - keep:
+                self.start = (self.start + 1) % cap
+                self.count -= 1
+            else:
+                self._grow()
+                cap = self.capacity
+
+        i = (self.start + self.count) % cap
+        self.data[:, i] = self.data[:, i + cap] = (self.distance, x, y)
+        self.count += 1
+
+    def sample(self, offsets):
+        # Positions `offsets` pixels behind the head, in one vectorized pass.
+        # Offsets beyond the recorded history clamp to the oldest sample.
+        window = self.window()
+        targets = self.distance - offsets
+        return np.interp(targets, window[0], window[1]), np.interp(targets, window[0], window[2])
+
+    def window(self):
+        # The recorded samples, oldest first, as a (3, count) view
+        return self.data[:, self.start:self.start + self.count]
+
+    def recent(self, keep):
+        # The shortest tail of window() that still covers `keep` pixels
+        # behind the head: from the last sample at or beyond that distance
+        window = self.window()
+        first = np.searchsorted(window[0], self.distance - keep, side="right") - 1
+        return window[:, max(first, 0):]
+
+    def load(self, window, capacity):
+        # Replace the history with a copy of an earlier window(), e.g. when rewinding
+        count = window.shape[1]
+        self.capacity = capacity
+        self.data = np.zeros((3, 2 * capacity))
+        self.data[:, :count] = window
+        self.data[:, capacity:capacity + count] = window
+        self.start = 0
+        self.count = count
+        self.distance = window[0, -1].item()
+        self.last = (window[1, -1].item(), window[2, -1].item())
+
+    def _grow(self):
+        window = self.window()
+        cap = self.capacity * 2
+        data = np.zeros((3, 2 * cap))
+        data[:, :self.count] = window
+        data[:, cap:cap + self.count] = window
+        self.data = data
+        self.capacity = cap
+        self.start = 0
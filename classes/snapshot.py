@@ -0,0 +1,94 @@
+# classes/snapshot.py
+# Compact binary snapshots of a World for spectators. Each snapshot is a set
+# of int16 sections; a keyframe sends them whole, a delta sends each section
+# as its difference from the previous snapshot wherever its length is
+# unchanged. Either way the section data is zlib-compressed, so the runs of
+# zeros and small steps in a delta cost next to nothing.
+import struct
+import zlib
+import numpy as np
+from config.config import starting_ammo
+
+STATES = ("running", "paused", "won", "lost", "rewinding")
+AMMO_TYPES = tuple(starting_ammo)
+PLATFORM_KIND = len(AMMO_TYPES)  # Projectile kind of a feathershot turned platform
+
+# Section name -> values per row. "state" is a single row of scalars:
+# game state, charging, power, health, current ammo, then one count per ammo type.
+SECTIONS = (
+    ("state", 5 + len(AMMO_TYPES)),
+    ("player", 2),  # left, top
+    ("segments", 2),  # left, top, head first, snake by snake
+    ("projectiles", 3),  # left, top, kind
+    ("food", 2),
+    ("acid", 2),
+    ("platforms", 4),  # Level platforms: x, y, w, h
+)
+KEYFRAME = 0
+DELTA = 1
+HEADER = struct.Struct("<BIB")  # Kind, sequence number, delta mask (bit i: section i is a delta)
+COUNTS = struct.Struct(f"<{len(SECTIONS)}H")  # Rows per section
+LENGTH = struct.Struct("<I")  # Every message on the wire is prefixed with its length
+
+
+def capture(world, platforms=None):
+    # The world's drawable state as a list of int16 arrays, one per section.
+    # Pass `platforms` (a previous capture's last section) to skip re-reading
+    # the level, which never changes.
+    player = world.player
+    state = [STATES.index(world.game_state), world.charging, world.power, int(player.health),
+             AMMO_TYPES.index(player.current_ammo), *(player.ammo_counts.get(ammo, 0) for ammo in AMMO_TYPES)]
+    projectiles = [(proj.rect.left, proj.rect.top, PLATFORM_KIND if proj.is_platform else AMMO_TYPES.index(proj.ammo_type))
+                   for proj in world.projectiles]
+    if platforms is None:
+        platforms = _array(world.level.rects, 4)
+    return [
+        _array([state], SECTIONS[0][1]),
+        _array([player.rect.topleft], 2),
+        _array([segment.rect.topleft for segment in world.segments()], 2),
+        _array(projectiles, 3),
+        _array([food.rect.topleft for food in world.food_group], 2),
+        _array([acid.rect.topleft for acid in world.acid_group], 2),
+        platforms,
+    ]
+
+
+def _array(rows, columns):
+    return np.clip(np.array(rows, dtype=np.int64).reshape(-1, columns), -32768, 32767).astype(np.int16)
+
+
+def encode(sequence, sections, previous=None):
+    # One message (without its length prefix). With `previous`, the snapshot
+    # the receiver already holds, sections of unchanged length become deltas.
+    mask = 0
+    chunks = []
+    for i, section in enumerate(sections):
+        if previous is not None and previous[i].shape == section.shape:
+            mask |= 1 << i
+            section = section - previous[i]  # Wraps around in int16; decode adds it back the same way
+        chunks.append(section.tobytes())
+    kind = KEYFRAME if previous is None else DELTA
+    body = COUNTS.pack(*(len(section) for section in sections)) + b"".join(chunks)
+    return HEADER.pack(kind, sequence, mask) + zlib.compress(body, 1)
+
+
+def decode(message, previous=None):
+    # Returns (sequence, sections). A delta needs the snapshot before it.
+    kind, sequence, mask = HEADER.unpack_from(message)
+    if kind == DELTA and previous is None:
+        raise ValueError("delta snapshot without the snapshot it is based on")
+    body = zlib.decompress(message[HEADER.size:])
+    counts = COUNTS.unpack_from(body)
+    offset = COUNTS.size
+    sections = []
+    for i, ((_, columns), count) in enumerate(zip(SECTIONS, counts)):
+        section = np.frombuffer(body, dtype=np.int16, count=count * columns, offset=offset).reshape(count, columns)
+        offset += section.nbytes
+        if mask & (1 << i):
+            section = section + previous[i]
+        sections.append(section)
+    return sequence, sections
+
+
+def as_dict(sections):
+    return {name: section for (name, _), section in zip(SECTIONS, sections)}
@@ -0,0 +1,166 @@
+# classes/spatial_hash.py
+# Uniform grid broadphase used by every collision check in the game
+
+
+class SpatialHash:
+    # Buckets objects by the grid cells their rect covers. Queries return
+    # candidates in insertion order so results stay deterministic.
+    def __init__(self, cell_size=64, live_only=True):
+        self.cell_size = cell_size
+        self.live_only = live_only  # Skip sprites that were kill()ed since the rebuild
+        self.cells = {}
+        self.count = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+    def insert(self, obj, rect=None):
+        entry = (self.count, obj)
+        self.count += 1
+        for key in self._keys(rect or obj.rect):
+            bucket = self.cells.get(key)
+            if bucket is None:
+                self.cells[key] = [entry]
+            else:
+                bucket.append(entry)
+
+    def query_items(self, rect):
+        # (insertion index, object) pairs for everything sharing a cell with rect
+        found = {}
+        for key in self._keys(rect):
+            bucket = self.cells.get(key)
+            if bucket:
+                for index, obj in bucket:
+                    found[index] = obj
+        items = sorted(found.items())
+        if self.live_only:
+            return [(index, obj) for index, obj in items if obj.alive()]
+        return items
+
+    def query(self, rect):
+        return [obj for _, obj in self.query_items(rect)]
+
+    def _keys(self, rect):
+        size = self.cell_size
+        x0 = rect.left // size
+        y0 = rect.top // size
+        x1 = max(x0, (rect.right - 1) // size)
+        y1 = max(y0, (rect.bottom - 1) // size)
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+class IncrementalHash(SpatialHash):
+    # A SpatialHash kept up to date by insert/remove as objects come and go,
+    # for colliders that never move, plus nearest-object lookups
+    def __init__(self, cell_size=64):
+        super().__init__(cell_size, live_only=False)
+        self.entries = {}  # Object -> (entry, cell keys)
+        self.extent = None  # (min x, min y, max x, max y) over every cell ever used
+
+    def clear(self):
+        super().clear()
+        self.entries.clear()
+        self.extent = None
+
+    def insert(self, obj, rect=None):
+        keys = self._keys(rect or obj.rect)
+        entry = (self.count, obj)
+        self.count += 1
+        for key in keys:
+            bucket = self.cells.get(key)
+            if bucket is None:
+                self.cells[key] = [entry]
+            else:
+                bucket.append(entry)
+        self.entries[obj] = (entry, keys)
+        x0, y0 = keys[0]
+        x1, y1 = keys[-1]
+        if self.extent is None:
+            self.extent = (x0, y0, x1, y1)
+        else:
+            ex0, ey0, ex1, ey1 = self.extent
+            self.extent = (min(ex0, x0), min(ey0, y0), max(ex1, x1), max(ey1, y1))
+
+    def remove(self, obj):
+        entry, keys = self.entries.pop(obj)
+        for key in keys:
+            bucket = self.cells[key]
+            bucket.remove(entry)
+            if not bucket:
+                del self.cells[key]
+
+    def nearest(self, x, y):
+        # Object whose rect centre is closest to (x, y), earliest inserted on
+        # ties, or None. Searches rings of cells outwards from (x, y) and stops
+        # once no unsearched cell can hold anything closer, so the cost depends
+        # on how far away the nearest object is rather than how many there are.
+        if not self.entries:
+            return None
+        size = self.cell_size
+        cx = int(x) // size
+        cy = int(y) // size
+        ex0, ey0, ex1, ey1 = self.extent
+        last = max(cx - ex0, ex1 - cx, cy - ey0, ey1 - cy)
+        best = None
+        for r in range(last + 1):
+            for key in ring(cx, cy, r):
+                bucket = self.cells.get(key)
+                if bucket:
+                    for index, obj in bucket:
+                        dx = obj.rect.centerx - x
+                        dy = obj.rect.centery - y
+                        candidate = (dx * dx + dy * dy, index)
+                        if best is None or candidate < best[0]:
+                            best = (candidate, obj)
+            # Anything not found yet has its centre at least r cells away
+            if best and best[0][0] <= (r * size) ** 2:
+                break
+        return best[1] if best else None
+
+
+def ring(cx, cy, r):
+    # Cell keys at Chebyshev distance r from (cx, cy)
+    if r == 0:
+        return [(cx, cy)]
+    keys = [(x, y) for x in range(cx - r, cx + r + 1) for y in (cy - r, cy + r)]
+    keys += [(x, y) for x in (cx - r, cx + r) for y in range(cy - r + 1, cy + r)]
+    return keys
+
+
+class CollisionIndex:
+    # One grid per kind of collider, rebuilt by World once per frame. Only
+    # colliders that hold still while they are being queried are indexed:
+    # moving projectiles never need to be found by anyone else. Acid droplets
+    # are looked up through their AcidGroup, which answers query() from its
+    # arrays, food through its FoodGroup, which keeps its own index, and the
+    # level's platforms through the StaticGeometry baked when it was loaded.
+    def __init__(self, cell_size=64):
+        self.platforms = None
+        self.food = None
+        self.acid = None
+        self.resting = SpatialHash(cell_size)  # Stopped projectiles and feathershot platforms
+        # Every snake's segments in one grid, snake by snake, head first.
+        # segment_owners[i] is (snake, index in snake.segments) for the
+        # segment inserted i-th.
+        self.segments = SpatialHash(cell_size, live_only=False)
+        self.segment_owners = []
+
+    def rebuild(self, platforms, food_group, acid_group, projectiles, snakes):
+        self.platforms = platforms
+        self.food = food_group
+        self.acid = acid_group
+        self.resting.clear()
+        for proj in projectiles.resting():
+            self.resting.insert(proj)
+        self.rebuild_segments(snakes)
+
+    def rebuild_segments(self, snakes):
+        # Segments move during SkySnake.update, so World re-bins them afterwards
+        self.segments.clear()
+        owners = self.segment_owners
+        owners.clear()
+        for snake in snakes:
+            for i, segment in enumerate(snake.segments):
+                self.segments.insert(segment)
+                owners.append((snake, i))
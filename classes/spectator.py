@@ -0,0 +1,132 @@
+# classes/spectator.py
+# Streams World snapshots to spectators over TCP ("host:port") or a Unix
+# socket (any other address is a socket path). The server never blocks the
+# game: sockets are non-blocking, and a spectator that falls too far behind
+# has its queued snapshots dropped and is sent a fresh keyframe instead.
+import logging
+import os
+import socket
+from config.config import SPECTATOR_BACKLOG
+from classes.snapshot import LENGTH, capture, encode
+
+
+def parse_address(address):
+    # "host:port" or ":port" -> (AF_INET, (host, port)); anything else -> (AF_UNIX, path)
+    host, _, port = address.rpartition(":")
+    if port.isdigit():
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    return socket.AF_UNIX, address
+
+
+class Spectator:
+    def __init__(self, sock):
+        self.sock = sock
+        self.queue = []  # Messages not yet sent; the first may be partly sent
+        self.sent = 0  # Bytes of queue[0] already sent
+        self.synced = False  # Holds the last snapshot, so can be sent deltas
+
+    def backlog(self):
+        return sum(len(message) for message in self.queue) - self.sent
+
+
+class SpectatorServer:
+    def __init__(self, address):
+        self.family, self.address = parse_address(address)
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)  # Left behind by a previous run
+        self.sock = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(self.address)
+        self.sock.listen()
+        self.sock.setblocking(False)
+        self.spectators = []
+        self.sequence = 0
+        self.previous = None  # Last snapshot sent
+        self.bytes_sent = 0
+        logging.info("Spectator server listening on %s", address)
+
+    def publish(self, world):
+        # Call once per frame: sends the world as it is now to every spectator
+        self._accept()
+        if not self.spectators:
+            self.previous = None
+            return
+        sections = capture(world, self.previous[-1] if self.previous else None)
+        self.sequence += 1
+        delta = keyframe = None
+        for spectator in self.spectators:
+            if spectator.synced:
+                if delta is None:
+                    delta = self._frame(encode(self.sequence, sections, self.previous))
+                spectator.queue.append(delta)
+            else:
+                if keyframe is None:
+                    keyframe = self._frame(encode(self.sequence, sections))
+                spectator.queue.append(keyframe)
+                spectator.synced = True
+        self.previous = sections
+        for spectator in list(self.spectators):
+            self._send(spectator)
+
+    def _frame(self, message):
+        return LENGTH.pack(len(message)) + message
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            if self.family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.spectators.append(Spectator(sock))
+            logging.info("Spectator connected (%d watching)", len(self.spectators))
+
+    def _send(self, spectator):
+        try:
+            while spectator.queue:
+                sent = spectator.sock.send(memoryview(spectator.queue[0])[spectator.sent:])
+                self.bytes_sent += sent
+                spectator.sent += sent
+                if spectator.sent < len(spectator.queue[0]):
+                    break
+                spectator.queue.pop(0)
+                spectator.sent = 0
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self._drop(spectator)
+            return
+        if spectator.backlog() > SPECTATOR_BACKLOG:
+            # Too slow to keep up: keep only the message already on the wire
+            # and resynchronise with a keyframe
+            del spectator.queue[1 if spectator.sent else 0:]
+            spectator.synced = False
+
+    def _drop(self, spectator):
+        spectator.sock.close()
+        self.spectators.remove(spectator)
+        logging.info("Spectator disconnected (%d watching)", len(self.spectators))
+
+    def close(self):
+        for spectator in list(self.spectators):
+            self._drop(spectator)
+        self.sock.close()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+def read_messages(stream):
+    # Yields messages from a file-like byte stream (a socket's makefile() or a
+    # saved session) until it ends
+    while True:
+        prefix = stream.read(LENGTH.size)
+        if len(prefix) < LENGTH.size:
+            return
+        (length,) = LENGTH.unpack(prefix)
+        message = stream.read(length)
+        if len(message) < length:
+            return
+        yield message
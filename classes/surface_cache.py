@@ -0,0 +1,36 @@
+# classes/surface_cache.py
+# Shared, reusable surfaces so steady-state frames allocate nothing
+from functools import lru_cache
+import pygame
+
+_solid_surfaces = {}
+
+
+def solid_surface(size, color):
+    # One filled Surface per (size, colour), shared by every sprite that uses it.
+    # Callers must treat the result as read-only.
+    key = (tuple(size), tuple(color))
+    surface = _solid_surfaces.get(key)
+    if surface is None:
+        surface = pygame.Surface(key[0])
+        surface.fill(key[1])
+        _solid_surfaces[key] = surface
+    return surface
+
+
+@lru_cache(maxsize=256)
+def render_text(font, text, color, antialias=True):
+    # font.render() rasterizes glyphs on every call; HUD strings rarely change
+    return font.render(text, antialias, color)
+
+
+def circle_surface(radius, color):
+    # A filled circle on a transparent (colour-keyed) square, shared like solid_surface
+    key = ("circle", radius, tuple(color))
+    surface = _solid_surfaces.get(key)
+    if surface is None:
+        surface = pygame.Surface((radius * 2, radius * 2))
+        surface.set_colorkey((0, 0, 0))
+        pygame.draw.circle(surface, color, (radius, radius), radius)
+        _solid_surfaces[key] = surface
+    return surface
@@ -0,0 +1,147 @@
+# classes/vec_env.py
+# Many independent headless games stepped in lockstep for bot training.
+# Actions, observations, rewards and done flags are NumPy arrays with one row
+# per game; each game keeps its own RNG state, so a game plays out the same
+# whatever the other games in the batch do.
+import math
+import random
+import numpy as np
+import pygame
+from config.config import LEVEL, ENV_HEALTH_PENALTY, ENV_MAX_FRAMES
+from classes.world import World, FrameInput
+from classes.projectile import AMMO_CODES
+
+AMMO_TYPES = tuple(AMMO_CODES)
+AMMO_KEYS = (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4)
+
+# Columns of an action row. move: -1 left, 0 stay, 1 right; jump: 0/1;
+# ammo: index into AMMO_TYPES to switch to, -1 to keep; trigger: 1 while the
+# shot is charging, releasing it (1 -> 0) fires; angle: aim in radians,
+# screen space (0 is right, -pi/2 straight up).
+ACTION = ("move", "jump", "ammo", "trigger", "angle")
+
+# Columns of an observation row. Positions are in pixels; acid_* is the
+# nearest droplet above the player and spent_dx the nearest spent shot lying
+# on the ground, relative to the player (0 when there is none).
+OBSERVATION = (
+    "player_x", "player_y", "player_vy", "health", "on_ground", "ammo",
+    *(f"{ammo}_count" for ammo in AMMO_TYPES), "charging", "power",
+    "head_x", "head_y", "snake_vx", "snake_vy", "segments", "tail_x", "tail_y",
+    "acid_dx", "acid_dy", "spent_dx", "frame",
+)
+
+
+class VecEnv:
+    def __init__(self, count, seed=0, max_frames=ENV_MAX_FRAMES, level=LEVEL):
+        self.count = count
+        self.max_frames = max_frames
+        self.worlds = []
+        self.rng_states = []
+        saved = random.getstate()
+        for i in range(count):
+            random.seed(seed + i)
+            self.worlds.append(World(level=level))
+            self.rng_states.append(random.getstate())
+        random.setstate(saved)
+        self.triggers = [False] * count
+        self.observations = np.zeros((count, len(OBSERVATION)), dtype=np.float32)
+        for i, world in enumerate(self.worlds):
+            self.observe(i, world)
+
+    def reset(self):
+        # Start every game over; returns the observations
+        saved = random.getstate()
+        for i, world in enumerate(self.worlds):
+            random.setstate(self.rng_states[i])
+            world.reset()
+            self.triggers[i] = False
+            self.observe(i, world)
+            self.rng_states[i] = random.getstate()
+        random.setstate(saved)
+        return self.observations.copy()
+
+    def step(self, actions):
+        # Advance every game one tick. Returns (observations, rewards, dones,
+        # info); a game that ends is reset straight away, so its observation
+        # is already from the next game. The reward is segments shot off
+        # minus ENV_HEALTH_PENALTY per point of health lost.
+        actions = np.asarray(actions, dtype=np.float64).reshape(self.count, len(ACTION))
+        removed = np.zeros(self.count, dtype=np.int64)
+        health_lost = np.zeros(self.count)
+        dones = np.zeros(self.count, dtype=bool)
+        won = np.zeros(self.count, dtype=bool)
+        saved = random.getstate()
+        for i, (world, action) in enumerate(zip(self.worlds, actions.tolist())):
+            random.setstate(self.rng_states[i])
+            segments = len(world.snake.segments)
+            health = world.player.health
+            world.step(self.frame_input(i, world, action))
+            removed[i] = max(0, segments - len(world.snake.segments))
+            health_lost[i] = max(0.0, health - world.player.health)
+            if world.game_state == "won":
+                removed[i] += 1  # The last segment isn't popped, the snake is just defeated
+            if world.game_state != "running" or world.frame >= self.max_frames:
+                dones[i] = True
+                won[i] = world.game_state == "won"
+                world.reset()
+                self.triggers[i] = False
+            self.observe(i, world)
+            self.rng_states[i] = random.getstate()
+        random.setstate(saved)
+        rewards = removed - ENV_HEALTH_PENALTY * health_lost
+        info = {"segments_removed": removed, "health_lost": health_lost, "won": won}
+        return self.observations.copy(), rewards, dones, info
+
+    def frame_input(self, i, world, action):
+        move, jump, ammo, trigger, angle = action
+        player = world.player
+        held = []
+        if move < 0:
+            held.append(pygame.K_a)
+        elif move > 0:
+            held.append(pygame.K_d)
+        if jump:
+            held.append(pygame.K_SPACE)
+        events = []
+        ammo = int(ammo)
+        if 0 <= ammo < len(AMMO_TYPES) and AMMO_TYPES[ammo] != player.current_ammo:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=AMMO_KEYS[ammo], mod=0))
+        trigger = bool(trigger)
+        if trigger and not self.triggers[i]:
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=player.rect.center))
+        elif self.triggers[i] and not trigger:
+            cx, cy = player.rect.center
+            target = (int(cx + 100 * math.cos(angle)), int(cy + 100 * math.sin(angle)))
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=target))
+        self.triggers[i] = trigger
+        return FrameInput(events, held)
+
+    def observe(self, i, world):
+        player = world.player
+        rect = player.rect
+        snake = world.snake
+        tail = snake.segments[-1].rect
+        acid_dx = acid_dy = 0
+        nearest = None
+        for acid in world.acid_group:
+            if acid.rect.bottom < rect.top:
+                distance = abs(acid.rect.centerx - rect.centerx)
+                if nearest is None or distance < nearest:
+                    nearest = distance
+                    acid_dx = acid.rect.centerx - rect.centerx
+                    acid_dy = acid.rect.centery - rect.centery
+        spent_dx = 0
+        nearest = None
+        for proj in world.projectiles.resting():
+            if not proj.is_platform:
+                distance = abs(proj.rect.centerx - rect.centerx)
+                if nearest is None or distance < nearest:
+                    nearest = distance
+                    spent_dx = proj.rect.centerx - rect.centerx
+        self.observations[i] = (
+            rect.centerx, rect.centery, player.vy, player.health, player.on_ground,
+            AMMO_TYPES.index(player.current_ammo), *(player.ammo_counts.get(ammo, 0) for ammo in AMMO_TYPES),
+            world.charging, world.power,
+            snake.head_pos[0], snake.head_pos[1], snake.velocity[0], snake.velocity[1], len(snake.segments),
+            tail.centerx, tail.centery, acid_dx, acid_dy, spent_dx, world.frame,
+        )
@@ -0,0 +1,287 @@
+# classes/world.py
+import pygame
+import math
+import hashlib
+import logging
+from config.config import POOL_SIZES, LEVEL, REWIND_MEMORY, TICK, TICK_RATE, WAVE_SEGMENTS, balance
+from classes.platform import Platform
+from classes.food import FoodGroup, food_pool
+from classes.sky_snake import SkySnake, segment_pool, spawn_wave
+from classes.player import Player
+from classes.projectile import ProjectileGroup, projectile_pool
+from classes.acid_droplet import AcidGroup, droplet_pool
+from classes.pool import release_all
+from classes.level import load_level, StaticGeometry
+from classes.spatial_hash import CollisionIndex
+from classes.profiler import FrameProfiler
+from classes.rewind import RewindBuffer
+
+# Keys the simulation reads as "held" every frame (movement and jump)
+HELD_KEYS = (pygame.K_a, pygame.K_d, pygame.K_SPACE)
+
+
+class FrameInput:
+    # One frame of input: the discrete events plus the keys held down.
+    # Indexing it like pygame.key.get_pressed() lets Player.update use it directly.
+    def __init__(self, events=(), held=()):
+        self.events = list(events)
+        self.held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+    @classmethod
+    def from_pygame(cls, events, pressed):
+        return cls(events, [key for key in HELD_KEYS if pressed[key]])
+
+
+class World:
+    # Owns all game state and per-frame logic; needs no window or clock,
+    # so it can be stepped as fast as the CPU allows.
+    def __init__(self, recorder=None, profiler=None, level=LEVEL, rewind_seconds=0, wave=0, prefill=True):
+        # Static platforms, spawn points and food zones come from the level file
+        self.level = load_level(level)
+        self.wave = wave  # Snakes per game in boss-wave mode; 0 for the usual single snake
+        self.projectiles = ProjectileGroup()
+        self.platforms = pygame.sprite.Group()
+        self.food_group = FoodGroup(level=self.level)
+        self.acid_group = AcidGroup()
+        self.player_group = pygame.sprite.GroupSingle()
+
+        platforms = [Platform(*rect) for rect in self.level.rects]
+        self.platforms.add(platforms)
+        self.geometry = StaticGeometry(self.level, platforms)
+
+        # Broadphase shared by every collision check, rebuilt once per frame
+        self.grid = CollisionIndex()
+
+        # Charging mechanics
+        self.max_power = 100
+        self.charge_rate = 4  # Power per 60th of a second
+
+        self.profiler = profiler or FrameProfiler()  # Disabled unless one is passed in
+
+        # Allocate the entities a game churns through before the first frame,
+        # or leave it to the caller (see prefill_pools) to get a window up sooner
+        if prefill:
+            self.prefill_pools()
+        self.snakes = []
+        self.snake = None  # The first snake still alive; bots and observations follow it
+
+        # Optional rewind history: every tick of the last `rewind_seconds`
+        self.rewind = RewindBuffer(int(rewind_seconds * TICK_RATE), REWIND_MEMORY) if rewind_seconds else None
+
+        self.recorder = None
+        self.reset()
+        self.recorder = recorder  # Optional InputRecorder; sees every later step and reset
+
+    def prefill_pools(self):
+        projectile_pool.prefill(POOL_SIZES["projectiles"], 0, 0, 0, 0, "regular")
+        droplet_pool.prefill(POOL_SIZES["acid"], 0, 0)
+        food_pool.prefill(POOL_SIZES["food"], (0, 0))  # Placed without touching the RNG
+        segment_pool.prefill(max(POOL_SIZES["segments"], self.wave * WAVE_SEGMENTS), (0, 0))
+
+    def reset(self):
+        # Pooled entities from the last game go back to their pools for this one
+        release_all(self.projectiles)
+        release_all(self.food_group)
+        release_all(self.acid_group)
+        self.player = Player(self.level.player_spawn)
+        self.player_group.empty()
+        self.player_group.add(self.player)
+        for snake in self.snakes:
+            snake.release()
+        if self.wave:
+            self.snakes = spawn_wave(self.level.snake_spawn, self.wave, WAVE_SEGMENTS)
+        else:
+            self.snakes = [SkySnake(self.level.snake_spawn)]
+        self.snake = self.snakes[0]
+        for _ in range(balance["food_count"]):
+            self.food_group.spawn()
+        self.charging = False
+        self.power = 0
+        self.frame = 0
+        self.game_state = "running"  # Possible states: "running", "paused", "won", "lost", "rewinding"
+        if self.rewind is not None:
+            self.rewind.clear()
+            self.rewind.capture(self)
+        if self.recorder:
+            self.recorder.record_reset()
+        logging.info("Game reset")
+
+    def step(self, inputs=None):
+        if inputs is None:
+            inputs = FrameInput()
+        if self.recorder:
+            self.recorder.record_step(inputs)
+
+        profiler = self.profiler
+        for event in inputs.events:
+            if self.game_state == "running":
+                self.handle_event(event)
+        profiler.lap("input")
+
+        if self.game_state == "running":
+            grid = self.grid
+            grid.rebuild(self.geometry, self.food_group, self.acid_group, self.projectiles, self.snakes)
+            profiler.lap("broadphase")
+            self.player.update(inputs, self.platforms, self.projectiles, self.segments(), self.acid_group, self.food_group, grid)
+            profiler.lap("player")
+            for snake in self.snakes:
+                snake.update(self.food_group, self.acid_group, self.projectiles, grid)
+            grid.rebuild_segments(self.snakes)
+            profiler.lap("snake")
+            self.acid_group.update(self.platforms, self.projectiles, grid)
+            profiler.lap("acid")
+            self.projectiles.update(self.platforms, self.snakes, grid)
+            profiler.lap("projectiles")
+
+            # Check if snakes are defeated; the game is won with the last one
+            if self.projectiles.defeated_snake:
+                self.projectiles.defeated_snake = False
+                alive = [snake for snake in self.snakes if not snake.defeated]
+                if alive:
+                    for snake in self.snakes:
+                        if snake.defeated:
+                            snake.release()
+                    self.snakes = alive
+                    self.snake = alive[0]
+                    logging.info("Snake defeated, %d left", len(alive))
+                else:
+                    logging.info("Snake defeated, setting game_state to won")
+                    self.game_state = "won"
+
+            if self.player.health <= 0:
+                logging.info("Player health <= 0, setting game_state to lost")
+                self.game_state = "lost"
+
+            if self.charging and self.game_state == "running":
+                self.power = min(self.power + self.charge_rate * TICK, self.max_power)
+
+            self.frame += 1
+            if self.rewind is not None:
+                self.rewind.capture(self)
+                profiler.lap("rewind")
+
+        return self.game_state
+
+    def rewind_to(self, frame):
+        # Resume play from an earlier frame still in the rewind buffer,
+        # dropping everything recorded after it
+        index = self.rewind.index(frame)
+        self.rewind.restore(self, index)
+        self.rewind.truncate(index)
+        self.game_state = "running"
+        if self.recorder:
+            self.recorder.record_rewind(frame)
+        logging.info("Rewound to frame %d", frame)
+
+    def segments(self):
+        # Every snake's segments, snake by snake
+        if len(self.snakes) == 1:
+            return self.snake.segments
+        return [segment for snake in self.snakes for segment in snake.segments]
+
+    def resume(self):
+        # Leave the pause menu. Pausing arrives as an input event, but this
+        # comes from outside the simulation, so it is recorded separately.
+        if self.game_state != "paused":
+            return
+        self.game_state = "running"
+        if self.recorder:
+            self.recorder.record_resume()
+        logging.info("Game resumed")
+
+    def run(self, frames, inputs=None):
+        # Step up to `frames` frames headless, stopping early once the game ends.
+        # `inputs` is an optional callable(frame) -> FrameInput.
+        for _ in range(frames):
+            if self.game_state != "running":
+                break
+            self.step(inputs(self.frame) if inputs else None)
+        return self.frame
+
+    def state_digest(self):
+        # Hash of everything the simulation depends on, for comparing runs
+        player = self.player
+        state = (
+            self.game_state, self.frame, self.charging, self.power,
+            tuple(player.rect), player.vy, player.health, player.current_ammo, sorted(player.ammo_counts.items()),
+            tuple(self.snake.head_pos), tuple(self.snake.velocity), self.snake.drop_timer,
+            [tuple(segment.rect) for segment in self.snake.segments],
+            [(tuple(proj.rect), proj.x, proj.y, proj.vx, proj.vy, proj.stopped, proj.is_platform, proj.bounces, proj.timer)
+             for proj in self.projectiles],
+            [(tuple(acid.rect), acid.y, acid.vy) for acid in self.acid_group],
+            [tuple(food.rect) for food in self.food_group],
+        )
+        if len(self.snakes) > 1:
+            # The rest of a wave; left out otherwise so single-snake recordings still verify
+            state += tuple((tuple(snake.head_pos), tuple(snake.velocity), snake.drop_timer,
+                            [tuple(segment.rect) for segment in snake.segments]) for snake in self.snakes[1:])
+        return hashlib.sha1(repr(state).encode()).hexdigest()
+
+    def handle_event(self, event):
+        player = self.player
+        snake = self.snake
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:  # Left mouse button
+                self.charging = True
+                self.power = 0
+                logging.debug("Mouse button down: charging")
+            elif event.button == 3:  # Right mouse button
+                # Transform feathershot projectiles into platforms
+                for proj in self.projectiles:
+                    if proj.ammo_type == "feathershot" and not proj.is_platform:
+                        proj.make_platform()
+                        logging.info("Feathershot transformed into platform")
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.charging:
+            self.charging = False
+            mx, my = event.pos
+            projectile = player.shoot(mx, my, self.power)
+            if projectile:
+                self.projectiles.add(projectile)
+                logging.info(f"Projectile launched: {projectile.ammo_type}")
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.game_state = "paused"
+            elif event.mod & pygame.KMOD_SHIFT:
+                if event.key == pygame.K_1:
+                    player.ammo_counts["regular"] = 10
+                elif event.key == pygame.K_2:
+                    player.ammo_counts["bouncy"] = 10
+                elif event.key == pygame.K_3:
+                    player.ammo_counts["piercing"] = 10
+                elif event.key == pygame.K_4:
+                    player.ammo_counts["feathershot"] = 10
+                elif event.key == pygame.K_5:
+                    player.health = min(player.health + 5, 100)
+                elif event.key == pygame.K_6:
+                    snake.grow()
+                elif event.key == pygame.K_7:
+                    if len(snake.segments) > 1:
+                        segment_pool.release(snake.segments.pop())
+                elif event.key == pygame.K_8:
+                    self.food_group.spawn()
+                elif event.key == pygame.K_9:
+                    current_speed = math.hypot(snake.velocity[0], snake.velocity[1])
+                    if current_speed > 0:
+                        new_speed = min(current_speed * 1.1, 20)
+                        scale = new_speed / current_speed
+                        snake.velocity[0] *= scale
+                        snake.velocity[1] *= scale
+                elif event.key == pygame.K_0:
+                    current_speed = math.hypot(snake.velocity[0], snake.velocity[1])
+                    if current_speed > 0:
+                        new_speed = max(current_speed * 0.9, 1)
+                        scale = new_speed / current_speed
+                        snake.velocity[0] *= scale
+                        snake.velocity[1] *= scale
+            else:
+                if event.key == pygame.K_1:
+                    player.current_ammo = "regular"
+                elif event.key == pygame.K_2:
+                    player.current_ammo = "bouncy"
+                elif event.key == pygame.K_3:
+                    player.current_ammo = "piercing"
+                elif event.key == pygame.K_4:
+                    player.current_ammo = "feathershot"
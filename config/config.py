@@ -30,5 +30,98 @@ velocity_multipliers = {
     "feathershot": 0.9
 }
 
-# Debug print to confirm loading
-print("config.py loaded successfully")
\ No newline at end of file
+# Gravity per ammo type (feathershot floats further)
+ammo_gravity = {
+    "regular": 0.5,
+    "bouncy": 0.5,
+    "piercing": 0.5,
+    "feathershot": 0.3
+}
+
+# Platform bounces before a projectile stops
+ammo_max_bounces = {
+    "regular": 0,
+    "bouncy": 3,
+    "piercing": 0,
+    "feathershot": 0
+}
+
+# Ammo the player starts each game with
+starting_ammo = {
+    "regular": 10,
+    "bouncy": 5,
+    "piercing": 3,
+    "feathershot": 2
+}
+
+# Other balance values. Like the tables above, they are read when used, so
+# balance.py can change them in place between games.
+balance = {
+    "fall_damage": 45,  # Health lost falling the full height of the screen
+    "acid_drop_interval": 180,  # 60ths of a second between acid drops
+    "snake_turn_chance": 0.0167,  # Chance per 60th of a second that the snake turns
+    "snake_seek_food": False,  # Steer towards the nearest food or feathershot platform instead of wandering
+    "snake_turn_rate": 3.0,  # Degrees per 60th of a second the snake can turn while seeking
+    "food_count": 3,  # Food on screen at the start of a game; raise with snake_seek_food for a feast
+}
+
+# Timing. Speeds, gravity, rates and durations throughout the game are given
+# per 60th of a second (one tick at the default rate) and scaled by TICK, so
+# game speed is the same at any TICK_RATE.
+TICK_RATE = 60  # Simulation ticks per second
+# One tick in 60ths of a second; an int when it divides evenly, so whole
+# pixel and frame counts stay whole
+TICK = 60 // TICK_RATE if 60 % TICK_RATE == 0 else 60 / TICK_RATE
+RENDER_FPS = 144  # Frame rate cap for drawing, independent of TICK_RATE (0 for uncapped)
+MAX_TICKS_PER_FRAME = 5  # Ticks one frame may run to catch up before the game slows down instead
+LOW_LATENCY = False  # One frame per tick, polling input just before it (main.py --low-latency); ignores RENDER_FPS
+
+# Bot training environments (classes/vec_env.py)
+ENV_HEALTH_PENALTY = 0.05  # Reward lost per point of health, against 1 per snake segment shot off
+ENV_MAX_FRAMES = 5 * 60 * TICK_RATE  # Ticks before a game is cut off and reset (five minutes)
+
+# Rendering
+RENDER_DIRTY_RECTS = False  # Only clear and update the screen regions that changed
+DIRTY_RECT_MAX_FRACTION = 0.35  # Fall back to a full flip above this share of the screen
+
+# Frame-budget governor: when a frame's update and draw near the 60 FPS budget,
+# step down through these levels of optional detail, and back up with headroom.
+# The aim preview's length and dot spacing are in 60ths of a second.
+GOVERNOR = True
+GOVERNOR_LEVELS = (
+    {"aim_steps": 300, "aim_every": 2, "cull": False},  # Full detail
+    {"aim_steps": 200, "aim_every": 3, "cull": True},
+    {"aim_steps": 120, "aim_every": 4, "cull": True},
+    {"aim_steps": 60, "aim_every": 6, "cull": True},
+)
+GOVERNOR_HIGH = 0.9  # Step down when the smoothed frame time passes this share of the budget
+GOVERNOR_LOW = 0.6  # Step back up after GOVERNOR_RECOVER frames in a row below this share
+GOVERNOR_RECOVER = 120
+
+# Level file in levels/ (or a path to any level .json)
+LEVEL = "default"
+
+# Boss wave (main.py --wave): many snakes at once, each on its own path and acid timer
+WAVE_SNAKES = 30  # Snakes in a wave when --wave is given without a number
+WAVE_SEGMENTS = 20  # Starting length of each
+
+# Object pools: entities built before the first frame and reused after they are destroyed
+POOL_SIZES = {"projectiles": 64, "acid": 32, "food": 8, "segments": 64}
+GC_FREEZE = False  # Freeze and pause the garbage collector while a game is running; it runs between games
+
+# Rewind (Backspace in game, or after losing)
+REWIND_SECONDS = 10  # History kept for scrubbing back; 0 turns rewind off
+REWIND_MEMORY = 8 * 1024 * 1024  # Bytes preallocated for it; with many entities on screen it holds fewer seconds
+REWIND_SCRUB_SPEED = 2  # Frames moved per frame while Left/Right is held
+
+# Spectating (main.py --spectate)
+SPECTATOR_BACKLOG = 256 * 1024  # Bytes queued for a slow spectator before it is resynced with a keyframe
+
+# Profiling
+PROFILER_HISTORY = 3600  # Frames of per-stage timings kept for the overlay and trace export
+
+# Logging
+LOG_LEVEL = "DEBUG"  # Raise to "INFO" to skip the per-frame debug records entirely
+LOG_ASYNC = True  # Format and write log records on a background thread
+LOG_RATE_LIMIT = 0  # Max debug records per second from any one call site (0 = no limit)
+LOG_SAMPLE_EVERY = 1  # Keep 1 of every N debug records from each call site
@@ -0,0 +1,104 @@
+# config/logging_setup.py
+# Log pipeline that keeps disk writes and message formatting off the game loop
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+# Pass as extra= for records CallSiteFilter must never drop, such as the
+# per-tick lines analyze_logs.py counts frames by
+UNSAMPLED = {"unsampled": True}
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Enqueue records untouched. The stock QueueHandler formats the message in
+    # the calling thread; here that happens on the writer thread instead, so
+    # hot-path calls must pass immutable args (numbers, strings) with %-style messages.
+    def prepare(self, record):
+        return record
+
+
+class CallSiteFilter(logging.Filter):
+    # Thins out chatty call sites: keeps 1 of every `every` records and at most
+    # `per_second` records per second for each (file, line). Records above
+    # `max_level`, and records logged with extra=UNSAMPLED, always pass.
+    def __init__(self, per_second=0, every=1, max_level=logging.DEBUG):
+        super().__init__()
+        self.per_second = per_second
+        self.every = every
+        self.max_level = max_level
+        self.sites = {}  # (pathname, lineno) -> [second, count this second, total seen]
+
+    def filter(self, record):
+        if record.levelno > self.max_level or getattr(record, "unsampled", False):
+            return True
+        key = (record.pathname, record.lineno)
+        second = int(record.created)
+        site = self.sites.get(key)
+        if site is None:
+            site = self.sites[key] = [second, 0, 0]
+        site[2] += 1
+        if (site[2] - 1) % self.every:
+            return False
+        if site[0] != second:
+            site[0] = second
+            site[1] = 0
+        if self.per_second and site[1] >= self.per_second:
+            return False
+        site[1] += 1
+        return True
+
+
+def rotate_logs(paths):
+    # Shift each log in `paths` (newest first) one name down the list,
+    # dropping the oldest, so the first name is free for a new log
+    if os.path.exists(paths[-1]):
+        os.remove(paths[-1])
+    for older, newer in zip(paths[:0:-1], paths[-2::-1]):
+        if os.path.exists(newer):
+            os.rename(newer, older)
+
+
+def setup_logging(filename, level=logging.DEBUG, asynchronous=True, per_second=0, every=1, rotate=(),
+                  fmt='%(asctime)s - %(levelname)s - %(message)s'):
+    # Route the root logger to `filename`. With `asynchronous`, a background
+    # thread does the formatting and writing; it is flushed and stopped at exit.
+    # `rotate` names older logs to shift the previous ones into first, newest
+    # first; asynchronously that happens on a thread too, before the new log
+    # is opened, while records queue up.
+    file_handler = logging.FileHandler(filename, mode='w', delay=True)  # Overwrite if exists
+    file_handler.setFormatter(logging.Formatter(fmt))
+    paths = [filename, *rotate]
+
+    listener = None
+    if asynchronous:
+        records = queue.SimpleQueue()
+        handler = DeferredQueueHandler(records)
+        listener = logging.handlers.QueueListener(records, file_handler)
+
+        def start():
+            if rotate:
+                rotate_logs(paths)
+            listener.start()
+
+        def stop():
+            starter.join()
+            listener.stop()
+
+        starter = threading.Thread(target=start, name="log-rotate", daemon=True)
+        starter.start()
+        atexit.register(stop)
+    else:
+        if rotate:
+            rotate_logs(paths)
+        handler = file_handler
+
+    if per_second or every > 1:
+        handler.addFilter(CallSiteFilter(per_second, every))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+    return listener
@@ -0,0 +1,69 @@
+# headless.py
+# Runs the game simulation with no window and no frame cap
+import argparse
+import logging
+import math
+import random
+import time
+import numpy as np
+from config.config import LEVEL, WAVE_SNAKES
+from classes.world import World
+from classes.recording import replay
+from classes.vec_env import VecEnv, ACTION
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step the SkySnake world headless, as fast as possible")
+    parser.add_argument("--frames", type=int, default=10000, help="Number of frames to simulate")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the global random module")
+    parser.add_argument("--replay", metavar="FILE", help="Replay a recording made with main.py --record")
+    parser.add_argument("--level", default=LEVEL, help="Level name in levels/ or path to a level .json")
+    parser.add_argument("--wave", type=int, nargs="?", const=WAVE_SNAKES, default=0, metavar="N",
+                        help=f"Boss wave: N snakes at once (default {WAVE_SNAKES}); replays need the session's")
+    parser.add_argument("--envs", type=int, metavar="K", help="Step K games in lockstep through VecEnv with random actions")
+    args = parser.parse_args()
+
+    if args.envs:
+        # Throughput of the batched training environment
+        logging.disable(logging.CRITICAL)
+        env = VecEnv(args.envs, seed=args.seed or 0, level=args.level)
+        rng = np.random.default_rng(args.seed)
+        actions = np.zeros((args.envs, len(ACTION)))
+        games = 0
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            actions[:, 0] = rng.integers(-1, 2, args.envs)
+            actions[:, 1] = rng.random(args.envs) < 0.02
+            actions[:, 2] = -1
+            actions[:, 3] = rng.random(args.envs) < 0.9
+            actions[:, 4] = rng.uniform(-math.pi, 0, args.envs)
+            _, _, dones, _ = env.step(actions)
+            games += int(dones.sum())
+        elapsed = time.perf_counter() - start
+        steps = args.frames * args.envs
+        print(f"{steps} environment steps ({args.envs} games x {args.frames}) in {elapsed:.3f}s "
+              f"({steps / elapsed:.0f} steps/s), {games} games finished")
+        return 0
+
+    if args.replay:
+        start = time.perf_counter()
+        world, matches = replay(args.replay, args.level, args.wave)
+        elapsed = time.perf_counter() - start
+        verdict = {True: "matches", False: "DIFFERS from", None: "cannot be checked against"}[matches]
+        print(f"Replayed {args.replay} in {elapsed:.3f}s, final state: {world.game_state}; end state {verdict} the recording")
+        return 0 if matches is not False else 1
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    world = World(level=args.level, wave=args.wave)
+    start = time.perf_counter()
+    frames = world.run(args.frames)
+    elapsed = time.perf_counter() - start
+    fps = frames / elapsed if elapsed > 0 else float("inf")
+    print(f"{frames} frames in {elapsed:.3f}s ({fps:.0f} frames/s), final state: {world.game_state}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,38 @@
 # main.py
+import time
+started = time.perf_counter()  # For timing startup up to the first frame
+import os  # Import os for file operations
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Skip pygame's banner on stdout
 import pygame
-import random
-import math
+import argparse
+import atexit
 import logging
-import os  # Import os for file operations
+from functools import lru_cache
 from config.config import *  # Assumes config.py exists with constants like WIDTH, HEIGHT, etc.
-from classes.platform import Platform
-from classes.projectile import Projectile
-from classes.food import Food
-from classes.acid_droplet import AcidDroplet
-from classes.sky_snake import SkySnake
-from classes.player import Player
+from config.logging_setup import setup_logging
+from classes.surface_cache import render_text
+from classes.world import World, FrameInput
+from classes.renderer import Renderer
+from classes.recording import InputRecorder
+from classes.profiler import FrameProfiler
+from classes.governor import FrameGovernor
+from classes.interpolation import capture_positions
+from classes.pool import freeze_gc, thaw_gc
+from classes.spectator import SpectatorServer
+from classes.latency import InputLatency, latch
+
+parser = argparse.ArgumentParser(description="Slingshot Hero")
+parser.add_argument("--record", metavar="FILE", help="Record the RNG seed and all inputs for headless.py --replay")
+parser.add_argument("--profile", metavar="FILE", help="Profile every frame and write a Chrome trace (.json) or CSV on exit")
+parser.add_argument("--level", default=LEVEL, help="Level name in levels/ or path to a level .json")
+parser.add_argument("--wave", type=int, nargs="?", const=WAVE_SNAKES, default=0, metavar="N",
+                    help=f"Boss wave: N snakes at once (default {WAVE_SNAKES})")
+parser.add_argument("--spectate", metavar="ADDRESS", help="Stream the game to spectate.py viewers on host:port or a Unix socket path")
+parser.add_argument("--latency", metavar="FILE", help="Measure input latency; log a summary and write histograms (CSV) on exit")
+parser.add_argument("--low-latency", action="store_true", default=LOW_LATENCY,
+                    help="Draw a frame per tick and poll input just before it (late latching)")
+parser.add_argument("--quit-after", type=int, metavar="FRAMES", help="Quit after drawing this many frames, e.g. to time startup")
+args = parser.parse_args()
 
 # Create debug folder if it doesn't exist
 debug_folder = 'debug'
@@ -22,27 +44,23 @@ log_file_3 = os.path.join(debug_folder, 'game.log.3')
 log_file_2 = os.path.join(debug_folder, 'game.log.2')
 log_file_1 = os.path.join(debug_folder, 'game.log.1')
 
-# Rotate log files
-if os.path.exists(log_file_3):
-    os.remove(log_file_3)
-if os.path.exists(log_file_2):
-    os.rename(log_file_2, log_file_3)
-if os.path.exists(log_file_1):
-    os.rename(log_file_1, log_file_2)
-
-# Set up logging to game.log.1 in the debug folder
-logging.basicConfig(
-    filename=log_file_1,
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filemode='w'  # Overwrite if exists
+# Set up logging to game.log.1 in the debug folder, written from a background
+# thread, which also rotates the last two runs' logs to .2 and .3
+setup_logging(
+    log_file_1,
+    level=LOG_LEVEL,
+    asynchronous=LOG_ASYNC,
+    per_second=LOG_RATE_LIMIT,
+    every=LOG_SAMPLE_EVERY,
+    rotate=(log_file_2, log_file_3)
 )
 
 logging.info("Game starting")
 
 try:
-    # Initialize Pygame
-    pygame.init()
+    # Initialize only the Pygame subsystems the game uses (no audio or joysticks)
+    pygame.display.init()
+    pygame.font.init()
     logging.info("Pygame initialized")
 
     # Set up the game window
@@ -50,240 +68,220 @@ try:
     pygame.display.set_caption("Slingshot Hero")
     logging.info("Game window set up")
 
-    # Fonts for rendering UI text
+    # Font for rendering UI text
     font = pygame.font.Font(None, 36)
-    paused_font = pygame.font.Font(None, 72)
-    paused_text = paused_font.render("PAUSED", True, WHITE)
-    continue_text = font.render("CONTINUE", True, WHITE)
-    quit_text = font.render("QUIT", True, WHITE)
-    paused_rect = paused_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 50))
-    continue_rect = continue_text.get_rect(center=(WIDTH//2, HEIGHT//2))
-    quit_rect = quit_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))
-
     logging.info("Fonts initialized")
 
-    # Clock for controlling frame rate
-    clock = pygame.time.Clock()
-    logging.info("Clock initialized")
+    @lru_cache(maxsize=None)
+    def pause_menu():
+        # (surface, rect) for PAUSED, CONTINUE and QUIT, built the first time the game is paused
+        paused_text = render_text(pygame.font.Font(None, 72), "PAUSED", WHITE)
+        continue_text = render_text(font, "CONTINUE", WHITE)
+        quit_text = render_text(font, "QUIT", WHITE)
+        return ((paused_text, paused_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 50))),
+                (continue_text, continue_text.get_rect(center=(WIDTH//2, HEIGHT//2))),
+                (quit_text, quit_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 50))))
 
-    # Sprite groups
-    projectiles = pygame.sprite.Group()
-    platforms = pygame.sprite.Group()
-    food_group = pygame.sprite.Group()
-    acid_group = pygame.sprite.Group()
-    logging.info("Sprite groups created")
+    # Frame profiler: F3 toggles the overlay, --profile records from the start
+    profiler = FrameProfiler(history=PROFILER_HISTORY, enabled=bool(args.profile))
+    if args.profile:
+        atexit.register(profiler.dump, args.profile)
 
-    player = Player()
-    player_group = pygame.sprite.GroupSingle(player)
-    logging.info("Player initialized")
+    # Input latency: --latency stamps every click and key press and times it to the simulation and the screen
+    latency = InputLatency(enabled=bool(args.latency))
+    if args.latency:
+        atexit.register(latency.dump, args.latency)
 
-    snake = SkySnake()
-    logging.info("SkySnake initialized")
+    # Renderer: full flips, or only the changed regions when RENDER_DIRTY_RECTS is set
+    # Governor: drops optional detail when frames run over budget (GOVERNOR in config)
+    governor = FrameGovernor(enabled=GOVERNOR)
+    renderer = Renderer(screen, font, dirty=RENDER_DIRTY_RECTS, max_dirty_fraction=DIRTY_RECT_MAX_FRACTION, profiler=profiler,
+                        governor=governor)
 
-    # Add initial platforms
-    ground = Platform(0, HEIGHT - 20, WIDTH, 20)
-    platforms.add(ground)
-    logging.info("Platforms initialized")
+    # Clock for controlling frame rate
+    clock = pygame.time.Clock()
+    logging.info("Clock initialized")
 
-    # Add initial food
-    for _ in range(3):
-        food = Food()
-        food_group.add(food)
-    logging.info("Food initialized")
+    # All game state lives in the headless World; this loop only feeds it input and draws it
+    recorder = InputRecorder(args.record) if args.record else None  # Seeds the RNG, so create it first
+    world = World(recorder, profiler, args.level, REWIND_SECONDS, args.wave, prefill=False)  # Pools fill after the first frame
+    if recorder:
+        atexit.register(recorder.close, world)
+        logging.info("Recording inputs to %s (seed %d)", args.record, recorder.seed)
+    logging.info("World initialized")
 
-    # Charging mechanics
-    charging = False
-    power = 0
-    max_power = 100
-    charge_rate = 4
+    spectators = SpectatorServer(args.spectate) if args.spectate else None
+    if spectators:
+        atexit.register(spectators.close)
 
-    # Game state
-    game_state = "running"  # Possible states: "running", "paused", "won", "lost"
+    logging.info("Game loop starting")
+    gc_frozen = False
+    rewind_cursor = 0  # Rewind record shown while scrubbing
+    rewind_from = "running"  # State the rewind screen was opened from
 
-    # Function to reset the game
-    def reset_game():
-        global player, snake, game_state
-        projectiles.empty()
-        food_group.empty()
-        acid_group.empty()
-        player = Player()
-        player_group.empty()
-        player_group.add(player)
-        snake = SkySnake()
-        for _ in range(3):
-            food = Food()
-            food_group.add(food)
-        game_state = "running"
-        logging.info("Game reset")
+    def leave_rewind():
+        # Scrubbing restores earlier records (and the RNG) without recording
+        # anything, so put the world back as it was when the rewind screen
+        # opened before a reset or quit is recorded against it
+        if world.game_state == "rewinding":
+            world.rewind.restore(world, len(world.rewind) - 1)
+            world.game_state = rewind_from
+    frames_drawn = 0
 
-    logging.info("Game loop starting")
+    # The simulation advances in fixed ticks of 1 / TICK_RATE seconds, however
+    # fast frames are drawn: each frame runs as many ticks as the time since
+    # the last one covers, and draws moving sprites blended between the last two.
+    # With --low-latency, each frame instead sleeps until the next tick is due,
+    # then polls input, runs the tick and draws it as is, so a click or key
+    # press is simulated and on screen within the frame after it arrives.
+    tick_length = 1 / TICK_RATE
+    accumulator = 0.0
+    last_time = time.perf_counter()
+    pending = []  # Events that arrived on frames with no tick, for the next tick
+    previous = None  # Sprite positions before the latest tick
 
     while True:
-        for event in pygame.event.get():
+        profiler.start_frame()
+        if args.low_latency:
+            events = latch(last_time + tick_length - accumulator, latency)
+            profiler.lap("latch")
+        else:
+            events = latency.poll(pygame.event.get())
+        governor.start_frame()
+        for event in events:
             if event.type == pygame.QUIT:
                 logging.info("Quit event received")
+                leave_rewind()
                 pygame.quit()
                 exit()
-            elif game_state == "running":
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # Left mouse button
-                        charging = True
-                        power = 0
-                        logging.debug("Mouse button down: charging")
-                    elif event.button == 3:  # Right mouse button
-                        # Transform feathershot projectiles into platforms
-                        for proj in projectiles:
-                            if proj.ammo_type == "feathershot" and not proj.is_platform:
-                                proj.is_platform = True
-                                proj.stopped = True  # Stop movement
-                                proj.image = pygame.Surface((30, 30))
-                                proj.image.fill(CYAN)
-                                proj.rect = proj.image.get_rect(center=proj.rect.center)
-                                proj.timer = 0
-                                logging.info("Feathershot transformed into platform")
-                elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and charging:
-                    charging = False
-                    mx, my = event.pos
-                    projectile = player.shoot(mx, my, power)
-                    if projectile:
-                        projectiles.add(projectile)
-                        logging.info(f"Projectile launched: {projectile.ammo_type}")
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        game_state = "paused"
-                    elif event.mod & pygame.KMOD_SHIFT:
-                        if event.key == pygame.K_1:
-                            player.ammo_counts["regular"] = 10
-                        elif event.key == pygame.K_2:
-                            player.ammo_counts["bouncy"] = 10
-                        elif event.key == pygame.K_3:
-                            player.ammo_counts["piercing"] = 10
-                        elif event.key == pygame.K_4:
-                            player.ammo_counts["feathershot"] = 10
-                        elif event.key == pygame.K_5:
-                            player.health = min(player.health + 5, 100)
-                        elif event.key == pygame.K_6:
-                            new_segment = pygame.sprite.Sprite()
-                            new_segment.image = pygame.Surface((20, 20))
-                            new_segment.image.fill(RED)
-                            new_segment.rect = new_segment.image.get_rect(center=snake.segments[-1].rect.center)
-                            snake.segments.append(new_segment)
-                        elif event.key == pygame.K_7:
-                            if len(snake.segments) > 1:
-                                snake.segments.pop()
-                        elif event.key == pygame.K_8:
-                            new_food = Food()
-                            food_group.add(new_food)
-                        elif event.key == pygame.K_9:
-                            current_speed = math.hypot(snake.velocity[0], snake.velocity[1])
-                            if current_speed > 0:
-                                new_speed = min(current_speed * 1.1, 20)
-                                scale = new_speed / current_speed
-                                snake.velocity[0] *= scale
-                                snake.velocity[1] *= scale
-                        elif event.key == pygame.K_0:
-                            current_speed = math.hypot(snake.velocity[0], snake.velocity[1])
-                            if current_speed > 0:
-                                new_speed = max(current_speed * 0.9, 1)
-                                scale = new_speed / current_speed
-                                snake.velocity[0] *= scale
-                                snake.velocity[1] *= scale
-                    else:
-                        if event.key == pygame.K_1:
-                            player.current_ammo = "regular"
-                        elif event.key == pygame.K_2:
-                            player.current_ammo = "bouncy"
-                        elif event.key == pygame.K_3:
-                            player.current_ammo = "piercing"
-                        elif event.key == pygame.K_4:
-                            player.current_ammo = "feathershot"
-            elif game_state == "paused":
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+            elif (event.type == pygame.KEYDOWN and event.key == pygame.K_BACKSPACE and world.game_state in ("running", "lost")
+                  and world.rewind is not None and len(world.rewind)):
+                # Backspace opens the rewind screen at the newest recorded frame
+                rewind_from = world.game_state
+                world.game_state = "rewinding"
+                rewind_cursor = len(world.rewind) - 1
+        profiler.lap("input")
+
+        # Past MAX_TICKS_PER_FRAME the game slows down rather than falling ever further behind
+        now = time.perf_counter()
+        accumulator = min(accumulator + now - last_time, tick_length * MAX_TICKS_PER_FRAME)
+        last_time = now
+        ticks = int(accumulator / tick_length)
+        accumulator -= ticks * tick_length
+
+        if world.game_state == "running":
+            pending += events
+            for tick in range(ticks):
+                if tick == ticks - 1 and not args.low_latency:
+                    previous = capture_positions(world)
+                world.step(FrameInput.from_pygame(pending, pygame.key.get_pressed()))
+                latency.stepped()
+                pending = []
+                if world.game_state != "running":
+                    break
+        elif world.game_state == "paused":
+            for event in events:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
-                        game_state = "running"
+                        world.resume()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
+                    (_, _), (_, continue_rect), (_, quit_rect) = pause_menu()
                     if continue_rect.collidepoint(event.pos):
-                        game_state = "running"
+                        world.resume()
                     elif quit_rect.collidepoint(event.pos):
                         logging.info("Quit selected from pause menu")
                         pygame.quit()
                         exit()
-            elif game_state in ["won", "lost"]:
+        elif world.game_state == "rewinding":
+            # Left/Right scrub through the rewind history, Enter resumes from the frame shown
+            pressed = pygame.key.get_pressed()
+            cursor = rewind_cursor + REWIND_SCRUB_SPEED * ticks * (pressed[pygame.K_RIGHT] - pressed[pygame.K_LEFT])
+            cursor = max(0, min(cursor, len(world.rewind) - 1))
+            if cursor != rewind_cursor:
+                rewind_cursor = cursor
+                world.rewind.restore(world, rewind_cursor)
+            for event in events:
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_RETURN:
+                        world.rewind_to(world.rewind.frame(rewind_cursor))
+                    elif event.key == pygame.K_r:
+                        leave_rewind()
+                        world.reset()
+        elif world.game_state in ["won", "lost"]:
+            for event in events:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_q:
                         logging.info("Quit key pressed")
                         pygame.quit()
                         exit()
                     elif event.key == pygame.K_r:
-                        reset_game()
+                        world.reset()
 
-        if game_state == "running":
-            keys = pygame.key.get_pressed()
-            player.update(keys, platforms, projectiles, snake.segments, acid_group, food_group)
-            snake.update(food_group, acid_group, projectiles)
-            acid_group.update(platforms, snake.segments, projectiles)
-            projectiles.update(platforms, snake.segments, acid_group, projectiles)
+        # Spectators get one snapshot per tick; frames drawn between ticks would only repeat it
+        if spectators and ticks:
+            spectators.publish(world)
+            profiler.lap("spectate")
 
-            # Check if snake is defeated
-            for proj in projectiles:
-                if proj.defeated_snake:
-                    logging.info("Snake defeated, setting game_state to won")
-                    game_state = "won"
-                    proj.defeated_snake = False
-                    break
-
-            if player.health <= 0:
-                logging.info("Player health <= 0, setting game_state to lost")
-                game_state = "lost"
+        # With GC_FREEZE the collector only runs while no game is in progress
+        game_state = world.game_state
+        if game_state != "running":
+            pending = []
+            latency.discard()
+            previous = None  # Whatever resumes play (a rewind, a reset) moves sprites without a tick
+        if GC_FREEZE and (game_state == "running") != gc_frozen:
+            gc_frozen = game_state == "running"
+            if gc_frozen:
+                freeze_gc()
+            else:
+                thaw_gc()
 
         # Draw everything
-        screen.fill(BLACK)
         if game_state == "running":
-            platforms.draw(screen)
-            food_group.draw(screen)
-            for segment in snake.segments:
-                screen.blit(segment.image, segment.rect)
-            player_group.draw(screen)
-            projectiles.draw(screen)
-            acid_group.draw(screen)
-
-            # Draw aiming trajectory
-            if charging:
-                mx, my = pygame.mouse.get_pos()
-                dx = mx - player.rect.centerx
-                dy = my - player.rect.centery
-                distance = (dx**2 + dy**2)**0.5
-                if distance > 0:
-                    multiplier = velocity_multipliers.get(player.current_ammo, 1.0)
-                    v = power * 0.2 * multiplier
-                    vx = v * (dx / distance)
-                    vy = v * (dy / distance)
-                    for t in range(30):
-                        x = player.rect.centerx + vx * t
-                        y = player.rect.centery + vy * t + 0.5 * 0.5 * t**2
-                        if 0 <= x <= WIDTH and 0 <= y <= HEIGHT:
-                            pygame.draw.circle(screen, WHITE, (int(x), int(y)), 2)
+            renderer.draw(world, pygame.mouse.get_pos(), previous=previous, alpha=accumulator / tick_length)
+        elif game_state == "rewinding":
+            seconds = (rewind_cursor - len(world.rewind) + 1) / TICK_RATE
+            renderer.draw(world, pygame.mouse.get_pos(),
+                          banner=f"REWIND {seconds:.1f}s - Left/Right to scrub, Enter to resume, R to restart")
+        else:
+            renderer.invalidate()
+            screen.fill(BLACK)
+            if game_state == "paused":
+                # Draw pause menu
+                pause_rect = pygame.Rect(WIDTH//2 - 150, HEIGHT//2 - 100, 300, 200)
+                pygame.draw.rect(screen, BLACK, pause_rect)
+                screen.blits(pause_menu())
+            elif game_state == "won":
+                screen.blit(render_text(font, "Congratulations, you defeated the SkySnake!", WHITE), (WIDTH // 2 - 200, HEIGHT // 2))
+                screen.blit(render_text(font, "Press 'R' to restart or 'Q' to quit", WHITE), (WIDTH // 2 - 150, HEIGHT // 2 + 40))
+            elif game_state == "lost":
+                screen.blit(render_text(font, "Game Over! You died.", WHITE), (WIDTH // 2 - 100, HEIGHT // 2))
+                screen.blit(render_text(font, "Press 'R' to restart or 'Q' to quit", WHITE), (WIDTH // 2 - 150, HEIGHT // 2 + 40))
+            profiler.lap("scene")
+            if profiler.overlay:
+                profiler.draw_overlay(screen, font)
+                profiler.lap("overlay")
 
-            # Draw UI
-            screen.blit(font.render(f"Ammo: {player.current_ammo}", True, WHITE), (10, 10))
-            screen.blit(font.render(f"Health: {int(player.health)}%", True, WHITE), (10, 50))
-            power = min(power + charge_rate, max_power) if charging else power
-        elif game_state == "paused":
-            # Draw pause menu
-            pause_rect = pygame.Rect(WIDTH//2 - 150, HEIGHT//2 - 100, 300, 200)
-            pygame.draw.rect(screen, BLACK, pause_rect)
-            screen.blit(paused_text, paused_rect)
-            screen.blit(continue_text, continue_rect)
-            screen.blit(quit_text, quit_rect)
-        elif game_state == "won":
-            screen.blit(font.render("Congratulations, you defeated the SkySnake!", True, WHITE), (WIDTH // 2 - 200, HEIGHT // 2))
-            screen.blit(font.render("Press 'R' to restart or 'Q' to quit", True, WHITE), (WIDTH // 2 - 150, HEIGHT // 2 + 40))
-        elif game_state == "lost":
-            screen.blit(font.render("Game Over! You died.", True, WHITE), (WIDTH // 2 - 100, HEIGHT // 2))
-            screen.blit(font.render("Press 'R' to restart or 'Q' to quit", True, WHITE), (WIDTH // 2 - 150, HEIGHT // 2 + 40))
+            pygame.display.flip()
+            profiler.lap("flip")
 
-        pygame.display.flip()
-        clock.tick(60)
+        latency.drawn()
+        frames_drawn += 1
+        if frames_drawn == 1:
+            # Work that can wait until the window is showing something
+            logging.info("First frame drawn %.1f ms after starting", (time.perf_counter() - started) * 1000)
+            world.prefill_pools()
+        if args.quit_after and frames_drawn >= args.quit_after:
+            leave_rewind()
+            logging.info("Quitting after %d frames (--quit-after)", frames_drawn)
+            pygame.quit()
+            exit()
+        governor.end_frame()
+        if not args.low_latency:
+            clock.tick(RENDER_FPS)
+        profiler.lap("sleep")
+        profiler.end_frame()
 except Exception as e:
     logging.error(f"An error occurred: {e}", exc_info=True)
     pygame.quit()
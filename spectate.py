@@ -0,0 +1,128 @@
+# spectate.py
+# Watches a game streamed by main.py --spectate, or plays back a saved stream
+import argparse
+import socket
+import threading
+import time
+import pygame
+from config.config import WIDTH, HEIGHT, BLACK, WHITE, GREY, RED, ORANGE, CYAN, NEON_GREEN, ammo_colors
+from classes.snapshot import STATES, AMMO_TYPES, PLATFORM_KIND, LENGTH, decode, as_dict
+from classes.spectator import parse_address, read_messages
+
+# Sprite sizes, which snapshots leave out
+SEGMENT_SIZE = FOOD_SIZE = 20
+PLAYER_SIZE = 40
+PROJECTILE_SIZE = ACID_SIZE = 10
+PLATFORM_SIZE = 30  # Feathershot turned platform
+
+
+class Feed:
+    # Decodes messages on a background thread so a slow frame never stalls
+    # the socket; `latest` is the newest snapshot as a dict of sections
+    def __init__(self, messages, save=None):
+        self.latest = None
+        self.bytes = 0
+        self.snapshots = 0
+        self.done = False
+        threading.Thread(target=self.run, args=(messages, save), daemon=True).start()
+
+    def run(self, messages, save):
+        previous = None
+        try:
+            for message in messages:
+                if save:
+                    save.write(LENGTH.pack(len(message)) + message)
+                    save.flush()
+                _, previous = decode(message, previous)
+                self.latest = as_dict(previous)
+                self.bytes += LENGTH.size + len(message)
+                self.snapshots += 1
+        finally:
+            self.done = True
+
+
+def paced(messages, fps):
+    # Plays a saved stream back at the rate it was recorded
+    interval = 1 / fps
+    next_time = time.perf_counter()
+    for message in messages:
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        next_time += interval
+        yield message
+
+
+def draw(screen, font, snapshot, status):
+    screen.fill(BLACK)
+    for x, y, w, h in snapshot["platforms"].tolist():
+        screen.fill(GREY, (x, y, w, h))
+    for x, y in snapshot["food"].tolist():
+        screen.fill(ORANGE, (x, y, FOOD_SIZE, FOOD_SIZE))
+    for x, y in snapshot["segments"].tolist():
+        screen.fill(RED, (x, y, SEGMENT_SIZE, SEGMENT_SIZE))
+    x, y = snapshot["player"][0].tolist()
+    screen.fill(WHITE, (x, y, PLAYER_SIZE, PLAYER_SIZE))
+    for x, y, kind in snapshot["projectiles"].tolist():
+        if kind == PLATFORM_KIND:
+            screen.fill(CYAN, (x, y, PLATFORM_SIZE, PLATFORM_SIZE))
+        else:
+            screen.fill(ammo_colors[AMMO_TYPES[kind]], (x, y, PROJECTILE_SIZE, PROJECTILE_SIZE))
+    for x, y in snapshot["acid"].tolist():
+        screen.fill(NEON_GREEN, (x, y, ACID_SIZE, ACID_SIZE))
+
+    state, charging, power, health, ammo, *counts = snapshot["state"][0].tolist()
+    screen.blit(font.render(f"Ammo: {AMMO_TYPES[ammo]} ({counts[ammo]})", True, WHITE), (10, 10))
+    screen.blit(font.render(f"Health: {health}%", True, WHITE), (10, 50))
+    if charging:
+        screen.blit(font.render(f"Power: {power}", True, WHITE), (10, 90))
+    if STATES[state] != "running":
+        screen.blit(font.render(STATES[state].upper(), True, WHITE), (WIDTH // 2 - 50, HEIGHT // 2))
+    screen.blit(font.render(status, True, GREY), (10, HEIGHT - 40))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a SkySnake game streamed with main.py --spectate")
+    parser.add_argument("address", nargs="?", help="host:port or Unix socket path the game is streaming to")
+    parser.add_argument("--save", metavar="FILE", help="Also save the stream for --play")
+    parser.add_argument("--play", metavar="FILE", help="Play back a saved stream instead of connecting")
+    parser.add_argument("--fps", type=int, default=60, help="Frame rate for --play")
+    args = parser.parse_args()
+    if not args.address and not args.play:
+        parser.error("give an address to connect to or --play FILE")
+
+    if args.play:
+        source = open(args.play, "rb")
+        feed = Feed(paced(read_messages(source), args.fps))
+    else:
+        family, address = parse_address(args.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.connect(address)
+        source = sock.makefile("rb")
+        save = open(args.save, "wb") if args.save else None
+        feed = Feed(read_messages(source), save)
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("SkySnake spectator")
+    font = pygame.font.Font(None, 36)
+    clock = pygame.time.Clock()
+    start = time.perf_counter()
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return 0
+        snapshot = feed.latest
+        if snapshot is not None:
+            elapsed = max(time.perf_counter() - start, 1e-6)
+            status = f"{feed.snapshots} snapshots, {feed.bytes / elapsed / 1024:.1f} KB/s"
+            if feed.done:
+                status += " - stream ended"
+            draw(screen, font, snapshot, status)
+            pygame.display.flip()
+        clock.tick(60)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())